@@ -0,0 +1,309 @@
+"""
+Benchmarks for the install pipeline, run against synthetic repository zips.
+
+Every benchmark runs in a fresh child process with LSM_PROJECT_ROOT pointing at
+a temporary directory, so timings and peak RSS are not polluted by earlier runs.
+Results are written as JSON for comparison across commits:
+
+    python benchmarks/run_benchmarks.py --champions 40 --skins 10 --jobs 8
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.server
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+sys.path.insert(0, BENCH_DIR)
+from synthetic_repo import generate_repo, champion_names
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def _tree_stats(path):
+    files = 0
+    size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return files, size
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler with single byte-range support, standing in for GitHub"""
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        size = os.path.getsize(path)
+        f = open(path, 'rb')
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else size - 1
+            if start >= size:
+                f.close()
+                self.send_error(416)
+                return None
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Content-Length", str(end - start + 1))
+            f.seek(start)
+            self.range_remaining = end - start + 1
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+            self.range_remaining = size
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = self.range_remaining
+        while remaining > 0:
+            chunk = source.read(min(1024 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+def serve_directory(directory):
+    """Start a threaded local HTTP server for directory, returning the server"""
+    handler = lambda *args, **kwargs: RangeRequestHandler(*args, directory=directory, **kwargs)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Benchmarks below run inside the child process, after src/ is importable.
+
+def bench_index(params):
+    from config import REPO_ZIP_PATH
+    from repo_index import build_index, load_index, _cache
+    build_s, index = _timed(build_index, REPO_ZIP_PATH)
+    _cache.clear()
+    load_s, _ = _timed(load_index, REPO_ZIP_PATH)
+    return {'build_s': build_s, 'load_from_disk_s': load_s, 'champions': len(index['champions'])}
+
+def bench_single_install(params):
+    from config import INSTALLED_DIR
+    from skin_installer import install_skins
+    champion = champion_names(1)[0]
+    cold_s, cold = _timed(install_skins, champion, jobs=params['jobs'])
+    warm_s, warm = _timed(install_skins, champion, jobs=params['jobs'])
+    files, size = _tree_stats(INSTALLED_DIR)
+    return {'cold_s': cold_s, 'warm_s': warm_s, 'cold': cold, 'warm': warm, 'files': files, 'bytes': size}
+
+def bench_batch_install(params):
+    from config import INSTALLED_DIR
+    from skin_installer import install_all_skins
+    champions = champion_names(params['champions'])
+    cold_s, _ = _timed(install_all_skins, champions, skip_chromas=params['skip_chromas'], jobs=params['jobs'])
+    files, size = _tree_stats(INSTALLED_DIR)
+    warm_s, _ = _timed(install_all_skins, champions, skip_chromas=params['skip_chromas'], jobs=params['jobs'])
+    return {
+        'cold_s': cold_s,
+        'warm_s': warm_s,
+        'files': files,
+        'bytes': size,
+        'files_per_s': files / cold_s if cold_s else None,
+        'mb_per_s': size / 1048576 / cold_s if cold_s else None,
+    }
+
+def bench_mod_catalog(params):
+    import mod_manager
+    from skin_installer import install_all_skins
+    install_all_skins(champion_names(params['champions']), skip_chromas=params['skip_chromas'], jobs=params['jobs'])
+    runs = []
+    cached_runs = []
+    for _ in range(params['repeat']):
+        # Drop the mtime cache so every run measures the directory scan and manifest read
+        mod_manager._catalog_cache['mtime_ns'] = None
+        seconds, mods = _timed(mod_manager.get_available_mods)
+        runs.append(seconds)
+        cached_runs.append(_timed(mod_manager.get_available_mods)[0])
+    runs.sort()
+    cached_runs.sort()
+    return {
+        'mods': len(mods),
+        'median_s': runs[len(runs) // 2],
+        'min_s': runs[0],
+        'cached_median_s': cached_runs[len(cached_runs) // 2],
+    }
+
+def bench_download(params):
+    from config import REPO_ZIP_PATH
+    from skin_downloader import download_file
+    server = serve_directory(params['serve_dir'])
+    url = f"http://127.0.0.1:{server.server_port}/{params['file']}"
+    results = {}
+    try:
+        for segments in params['segments']:
+            if os.path.exists(REPO_ZIP_PATH):
+                os.remove(REPO_ZIP_PATH)
+            stats = download_file(url, REPO_ZIP_PATH, segments)
+            results[f"segments_{segments}"] = {
+                'seconds': stats['seconds'],
+                'mb_per_s': stats['rate'] / 1048576,
+            }
+    finally:
+        server.shutdown()
+    return results
+
+BENCHMARKS = {
+    'index': bench_index,
+    'single_install': bench_single_install,
+    'batch_install': bench_batch_install,
+    'mod_catalog': bench_mod_catalog,
+    'download': bench_download,
+}
+
+def run_child(name, params):
+    """Entry point inside the child process"""
+    sys.path.insert(0, SRC_DIR)
+    from config import ensure_dirs
+    ensure_dirs()
+    result = BENCHMARKS[name](params)
+    result['peak_rss'] = peak_rss()
+    print(json.dumps(result))
+
+def run_isolated(name, params, repo_zip, with_repo=True):
+    """Run one benchmark in a child process with its own project root"""
+    root = tempfile.mkdtemp(prefix="lsm-bench-")
+    try:
+        if with_repo:
+            dest_dir = os.path.join(root, "data", "skins")
+            os.makedirs(dest_dir)
+            dest = os.path.join(dest_dir, "lol-skins-main.zip")
+            try:
+                os.link(repo_zip, dest)
+            except OSError:
+                shutil.copyfile(repo_zip, dest)
+        env = dict(os.environ, LSM_PROJECT_ROOT=root)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", name, json.dumps(params)],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1:] or ["failed"]}
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the skin install pipeline")
+    parser.add_argument("--champions", type=int, default=20)
+    parser.add_argument("--skins", type=int, default=10)
+    parser.add_argument("--chromas", type=int, default=3)
+    parser.add_argument("--files-per-skin", type=int, default=4)
+    parser.add_argument("--file-size", type=int, default=64 * 1024)
+    parser.add_argument("--scaling", default="2,8,32",
+                        help="Comma-separated files-per-skin values for the file-count scaling run")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--skip-chromas", action="store_true")
+    parser.add_argument("--only", help="Comma-separated subset of benchmarks to run")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], json.loads(args.child[1]))
+        return
+
+    selected = set(args.only.split(",")) if args.only else set(BENCHMARKS) | {'scaling'}
+    work_dir = tempfile.mkdtemp(prefix="lsm-bench-repo-")
+    try:
+        repo_zip = os.path.join(work_dir, "lol-skins-main.zip")
+        print("Generating synthetic repository...")
+        repo = generate_repo(repo_zip, args.champions, args.skins, args.chromas, args.files_per_skin, args.file_size)
+
+        params = {
+            'champions': args.champions,
+            'jobs': args.jobs,
+            'skip_chromas': args.skip_chromas,
+            'repeat': 5,
+            'serve_dir': work_dir,
+            'file': os.path.basename(repo_zip),
+            'segments': [1, 4],
+        }
+        results = {}
+        for name in BENCHMARKS:
+            if name in selected:
+                print(f"Running {name}...")
+                results[name] = run_isolated(name, params, repo_zip, with_repo=(name != 'download'))
+
+        if 'scaling' in selected:
+            results['scaling'] = []
+            for files_per_skin in [int(n) for n in args.scaling.split(",")]:
+                print(f"Running scaling with {files_per_skin} files per skin...")
+                scaled_zip = os.path.join(work_dir, f"scaling-{files_per_skin}.zip")
+                # Keep total payload constant so only the file count changes
+                file_size = max(1, args.file_size * args.files_per_skin // files_per_skin)
+                generate_repo(scaled_zip, args.champions, args.skins, args.chromas, files_per_skin, file_size)
+                run = run_isolated('batch_install', params, scaled_zip)
+                run['files_per_skin'] = files_per_skin
+                results['scaling'].append(run)
+                os.remove(scaled_zip)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repo': repo,
+        'params': {'jobs': args.jobs, 'skip_chromas': args.skip_chromas},
+        'results': results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'unknown'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
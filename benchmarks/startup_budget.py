@@ -0,0 +1,145 @@
+"""
+Time-to-menu check for the CLI, from source or from a built executable.
+
+Each run starts the app offline in a fresh child process with LSM_PROJECT_ROOT
+pointing at a temporary directory, waits for the menu prompt on stdout, then
+chooses Exit. The median over all runs is compared against the budget and the
+script exits non-zero when it is exceeded, so build.py can fail the build:
+
+    python benchmarks/startup_budget.py --budget 1.5
+    python benchmarks/startup_budget.py --exe dist/LeagueSkinManagerVN/LeagueSkinManagerVN.exe
+
+With --importtime the source entry point is also run under `python -X importtime`
+and the modules with the largest cumulative import time are listed.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, "src", "main.py")
+
+STARTUP_BUDGET = 1.5
+MENU_PROMPT = b"Select option:"
+EXIT_CHOICE = b"6\n"
+
+def _command(exe):
+    if exe:
+        return [exe, "--offline"]
+    return [sys.executable, MAIN_SCRIPT, "--offline"]
+
+def _env(root):
+    return dict(os.environ, LSM_PROJECT_ROOT=root, PYTHONUNBUFFERED="1")
+
+def time_to_menu(cmd, root, timeout=30):
+    """Seconds from process start until the menu prompt is printed"""
+    seen = threading.Event()
+    output = bytearray()
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd, env=_env(root), cwd=root,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+
+    def read():
+        while True:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk:
+                break
+            output.extend(chunk)
+            if MENU_PROMPT in output:
+                seen.set()
+        seen.set()
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    finished = seen.wait(timeout)
+    elapsed = time.perf_counter() - start
+
+    try:
+        proc.stdin.write(EXIT_CHOICE)
+        proc.stdin.close()
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    reader.join(timeout=5)
+
+    if not finished or MENU_PROMPT not in output:
+        tail = output[-2000:].decode(errors="replace")
+        raise RuntimeError(f"Menu prompt not seen (exit code {proc.returncode}):\n{tail}")
+    return elapsed
+
+def import_times(root, top=15):
+    """Largest cumulative import times, in seconds, from `python -X importtime`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", MAIN_SCRIPT, "--offline"],
+        input=EXIT_CHOICE, env=_env(root), cwd=root, capture_output=True,
+    )
+    modules = {}
+    for line in completed.stderr.decode(errors="replace").splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1e6
+    return sorted(modules.items(), key=lambda item: -item[1])[:top]
+
+def measure(exe=None, runs=5, budget=STARTUP_BUDGET, importtime=False):
+    """
+    Run the startup check.
+    Returns:
+        dict: { 'median': float, 'max': float, 'runs': [float], 'budget': float, 'ok': bool }
+    """
+    root = tempfile.mkdtemp(prefix="lsm-startup-")
+    try:
+        cmd = _command(exe)
+        samples = [time_to_menu(cmd, root) for _ in range(runs)]
+        median = statistics.median(samples)
+        result = {
+            'median': median,
+            'max': max(samples),
+            'runs': samples,
+            'budget': budget,
+            'ok': median <= budget,
+        }
+        if importtime:
+            result['imports'] = import_times(root)
+        return result
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when time-to-menu exceeds a budget")
+    parser.add_argument("--exe", help="Built executable to time instead of src/main.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=STARTUP_BUDGET,
+        help=f"Maximum median time-to-menu in seconds (default: {STARTUP_BUDGET})"
+    )
+    parser.add_argument("--importtime", action="store_true", help="List the slowest imports of src/main.py")
+    args = parser.parse_args()
+
+    result = measure(args.exe, args.runs, args.budget, args.importtime)
+    print(f"Target: {args.exe or MAIN_SCRIPT}")
+    print("Runs: " + ", ".join(f"{seconds:.3f}s" for seconds in result['runs']))
+    print(f"Time to menu: median {result['median']:.3f}s, max {result['max']:.3f}s, budget {args.budget:.3f}s")
+    for name, seconds in result.get('imports', []):
+        print(f"{seconds * 1000:>9.1f} ms  {name}")
+
+    if not result['ok']:
+        print("Startup budget exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
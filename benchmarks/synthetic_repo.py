@@ -0,0 +1,76 @@
+import io
+import os
+import random
+import zipfile
+import argparse
+
+ROOT = "lol-skins-main/skins"
+
+def _skin_zip(rng, files_per_skin, file_size, shared):
+    """Build one inner skin archive: META/info.json, a shared image and WAD payloads"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as skin:
+        skin.writestr("META/info.json", '{"Author": "bench", "Name": "skin", "Version": "1.0"}')
+        skin.writestr("META/image.png", shared)
+        for i in range(files_per_skin):
+            # Half random (incompressible), half repetitive, like real WAD contents
+            if i % 2:
+                payload = rng.randbytes(file_size)
+            else:
+                payload = bytes([i % 251]) * file_size
+            skin.writestr(f"WAD/{i:04d}.wad.client", payload)
+    return buffer.getvalue()
+
+def generate_repo(path, champions=20, skins=10, chromas=3, files_per_skin=4,
+                  file_size=64 * 1024, compression=zipfile.ZIP_DEFLATED, seed=1):
+    """
+    Write a fake lol-skins-main.zip with the same layout as the real repository:
+    skins/<Champion>/<Skin>.zip and skins/<Champion>/chromas/<Skin>/<Chroma>.zip.
+    Returns:
+        dict: counts and size of the generated archive
+    """
+    rng = random.Random(seed)
+    shared = rng.randbytes(4096)
+    members = 0
+    with zipfile.ZipFile(path, "w", compression) as repo:
+        repo.writestr("lol-skins-main/README.md", "synthetic benchmark repository")
+        for c in range(champions):
+            champion = f"Champion{c:03d}"
+            for s in range(skins):
+                skin = f"{champion} Skin{s:02d}"
+                repo.writestr(f"{ROOT}/{champion}/{skin}.zip", _skin_zip(rng, files_per_skin, file_size, shared))
+                members += 1
+                for k in range(chromas):
+                    repo.writestr(
+                        f"{ROOT}/{champion}/chromas/{skin}/{skin} Chroma{k}.zip",
+                        _skin_zip(rng, max(1, files_per_skin // 2), file_size, shared),
+                    )
+                    members += 1
+    return {
+        'champions': champions,
+        'skins': skins,
+        'chromas': chromas,
+        'files_per_skin': files_per_skin,
+        'file_size': file_size,
+        'members': members,
+        'bytes': os.path.getsize(path),
+    }
+
+def champion_names(champions):
+    return [f"Champion{c:03d}" for c in range(champions)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic skins repository zip")
+    parser.add_argument("path")
+    parser.add_argument("--champions", type=int, default=20)
+    parser.add_argument("--skins", type=int, default=10)
+    parser.add_argument("--chromas", type=int, default=3)
+    parser.add_argument("--files-per-skin", type=int, default=4)
+    parser.add_argument("--file-size", type=int, default=64 * 1024)
+    parser.add_argument("--stored", action="store_true", help="Store inner zips uncompressed")
+    args = parser.parse_args()
+    info = generate_repo(
+        args.path, args.champions, args.skins, args.chromas, args.files_per_skin, args.file_size,
+        zipfile.ZIP_STORED if args.stored else zipfile.ZIP_DEFLATED,
+    )
+    print(info)
@@ -1,5 +1,8 @@
 import os
+import sys
 import shutil
+import argparse
+import subprocess
 import PyInstaller.__main__
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -7,6 +10,7 @@ SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
 BUILD_DIR = os.path.join(PROJECT_ROOT, 'build')
 DIST_DIR = os.path.join(PROJECT_ROOT, 'dist')
 EXE_NAME = 'LeagueSkinManagerVN'
+STARTUP_CHECK = os.path.join(PROJECT_ROOT, 'benchmarks', 'startup_budget.py')
 
 def patch_config():
     """Patch config.py for executable environment"""
@@ -33,7 +37,29 @@ def post_build_cleanup():
     os.makedirs(dist_data, exist_ok=True)
     print(f"Created data directory at: {dist_data}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the League Skin Manager VN executable")
+    parser.add_argument(
+        '--fast-start', action='store_true',
+        help="Build a folder instead of a single file so nothing is unpacked on launch, "
+             "then fail if time-to-menu is over budget"
+    )
+    parser.add_argument(
+        '--budget', type=float,
+        help="Maximum median time-to-menu in seconds for --fast-start builds"
+    )
+    return parser.parse_args()
+
+def check_startup(budget=None):
+    """Time the built executable to its menu; False if it is over budget"""
+    exe_path = os.path.join(DIST_DIR, EXE_NAME, EXE_NAME + ('.exe' if os.name == 'nt' else ''))
+    cmd = [sys.executable, STARTUP_CHECK, '--exe', exe_path]
+    if budget is not None:
+        cmd += ['--budget', str(budget)]
+    return subprocess.run(cmd).returncode == 0
+
 def main():
+    args = parse_args()
     for path in [BUILD_DIR, DIST_DIR]:
         if os.path.exists(path):
             shutil.rmtree(path)
@@ -41,7 +67,7 @@ def main():
     pyinstaller_args = [
         os.path.join(SRC_DIR, 'main.py'),
         '--name', EXE_NAME,
-        '--onefile',
+        '--onedir' if args.fast_start else '--onefile',
         '--console',
         '--distpath', DIST_DIR,
         '--workpath', BUILD_DIR,
@@ -51,12 +77,23 @@ def main():
         '--hidden-import=champions',
         '--hidden-import=skin_downloader',
         '--hidden-import=skin_installer',
-        '--hidden-import=update_checker'
+        '--hidden-import=update_checker',
+        '--hidden-import=mod_manager',
+        '--hidden-import=sparse_fetch',
+        '--hidden-import=champion_watcher',
+        '--hidden-import=daemon'
     ]
+    if args.fast_start:
+        # Compressed binaries are decompressed on every launch
+        pyinstaller_args.append('--noupx')
 
     PyInstaller.__main__.run(pyinstaller_args)
     print(f"\nBuild complete! Executable is in: {DIST_DIR}")
 
+    if args.fast_start and not check_startup(args.budget):
+        print("Build failed: startup time is over budget")
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
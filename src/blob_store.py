@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from config import BLOB_STORE_DIR, DEDUP_STORE_ENABLED, COPY_BUFFER_SIZE
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+OBJECTS_DIR = os.path.join(BLOB_STORE_DIR, "objects")
+CATALOG_FILE = os.path.join(BLOB_STORE_DIR, "catalog.json")
+FICLONE = 0x40049409
+
+_enabled = DEDUP_STORE_ENABLED
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def set_enabled(enabled):
+    """Turn the content-addressed store on or off for this process"""
+    global _enabled
+    _enabled = enabled
+
+def is_enabled():
+    return _enabled
+
+def _blob_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest)
+
+def _load_catalog():
+    """(crc, size) -> sha256 lookup, so known files are linked without being read"""
+    global _catalog
+    if _catalog is None:
+        try:
+            with open(CATALOG_FILE) as f:
+                _catalog = json.load(f)
+        except (OSError, ValueError):
+            _catalog = {}
+    return _catalog
+
+def save_catalog():
+    """Persist the (crc, size) -> sha256 lookup"""
+    with _catalog_lock:
+        if _catalog is None:
+            return
+        os.makedirs(BLOB_STORE_DIR, exist_ok=True)
+        tmp_path = f"{CATALOG_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(_catalog, f)
+        os.replace(tmp_path, CATALOG_FILE)
+
+def _reflink(src, dest):
+    """Copy-on-write clone where the filesystem supports it (Linux FICLONE)"""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    with open(src, 'rb') as s, open(dest, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return True
+        except OSError:
+            pass
+    os.remove(dest)
+    return False
+
+def _link(blob, dest):
+    """Point dest at a blob: hardlink, else reflink, else plain copy"""
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(blob, dest)
+        return
+    except OSError:
+        pass
+    if not _reflink(blob, dest):
+        shutil.copyfile(blob, dest)
+
+def _store(skin_archive, info, replace=False):
+    """Stream a member into the store while hashing it, returning its sha256"""
+    tmp_dir = os.path.join(BLOB_STORE_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out, skin_archive.open(info) as src:
+            while True:
+                chunk = src.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        blob = _blob_path(digest.hexdigest())
+        if os.path.exists(blob) and not replace:
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(tmp_path, blob)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest.hexdigest()
+
+def materialize(skin_archive, info, dest, verify=False):
+    """
+    Place a member of an inner skin archive at dest through the blob store.
+    Members already known by CRC and size are linked without decompressing them.
+    With verify, the member is always re-read and its blob rewritten, which is
+    what repairs use in case a hardlinked file was modified in place.
+    """
+    key = f"{info.CRC:08x}:{info.file_size}"
+    catalog = _load_catalog()
+    digest = None if verify else catalog.get(key)
+
+    if not digest or not os.path.exists(_blob_path(digest)):
+        digest = _store(skin_archive, info, replace=verify)
+        with _catalog_lock:
+            catalog[key] = digest
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    _link(_blob_path(digest), dest)
+
+def collect_garbage():
+    """
+    Delete blobs no installed file links to any more (link count of one) and
+    drop their catalog entries.
+    Returns:
+        dict: { 'blobs': int, 'bytes': int }
+    """
+    removed = {'blobs': 0, 'bytes': 0}
+    if not os.path.isdir(OBJECTS_DIR):
+        return removed
+
+    for prefix in os.scandir(OBJECTS_DIR):
+        if not prefix.is_dir():
+            continue
+        for blob in os.scandir(prefix.path):
+            # DirEntry.stat() reports no link count on Windows
+            stat = os.stat(blob.path)
+            if stat.st_nlink <= 1:
+                os.remove(blob.path)
+                removed['blobs'] += 1
+                removed['bytes'] += stat.st_size
+        if not os.listdir(prefix.path):
+            os.rmdir(prefix.path)
+
+    catalog = _load_catalog()
+    with _catalog_lock:
+        for key in [k for k, digest in catalog.items() if not os.path.exists(_blob_path(digest))]:
+            del catalog[key]
+    save_catalog()
+
+    shutil.rmtree(os.path.join(BLOB_STORE_DIR, "tmp"), ignore_errors=True)
+    logger.info(f"Blob store GC removed {removed['blobs']} blobs ({removed['bytes']} bytes)")
+    return removed
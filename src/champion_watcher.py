@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import warnings
+import threading
+import requests
+import http_client
+from urllib3.exceptions import InsecureRequestWarning
+from config import (
+    LIVE_CLIENT_URL,
+    LCU_CHAMPION_URL,
+    WATCH_MIN_INTERVAL,
+    WATCH_MAX_INTERVAL,
+    WATCH_BACKOFF,
+    WATCH_RETRY_MAX,
+    WATCH_STATE_FILE,
+)
+from logger import setup_logger
+from champions import find_champion
+from repo_index import classify_member
+from sparse_fetch import champion_source
+from skin_installer import install_skins, load_installed_manifest, apply_on_demand
+from mod_manager import load_enabled_mods, save_enabled_mods, build_overlay, run_overlay
+
+logger = setup_logger(__name__)
+
+# A source is a callable returning None when its endpoint is unreachable,
+# "" when reachable with no champion locked in, or a champion name/key.
+
+def _get_local(url, **kwargs):
+    """GET a local client endpoint; these serve a self-signed certificate, so it is not verified"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", InsecureRequestWarning)
+        return http_client.get(url, verify=False, timeout=1, **kwargs)
+
+def lcu_source(game_path):
+    """Poll the League client's champ-select API, authenticated through its lockfile"""
+    lockfiles = [os.path.join(game_path, "lockfile"), os.path.join(os.path.dirname(game_path), "lockfile")]
+
+    def poll():
+        for lockfile in lockfiles:
+            try:
+                with open(lockfile) as f:
+                    _, _, port, password, protocol = f.read().strip().split(":")
+                break
+            except (OSError, ValueError):
+                continue
+        else:
+            return None
+        try:
+            response = _get_local(LCU_CHAMPION_URL.format(protocol=protocol, port=port), auth=("riot", password))
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return ""
+        key = response.json()
+        return str(key) if key else ""
+
+    return poll
+
+def live_client_source(url=LIVE_CLIENT_URL):
+    """Poll the in-game live client API (only answers once the game has loaded)"""
+    def poll():
+        try:
+            response = _get_local(url)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return ""
+        players = response.json()
+        return players[0]['championName'] if players else ""
+
+    return poll
+
+def _load_auto_enabled():
+    """Mods watch mode enabled for the previous champion"""
+    try:
+        with open(WATCH_STATE_FILE) as f:
+            return json.load(f).get('auto_enabled', [])
+    except (OSError, ValueError):
+        return []
+
+def _save_auto_enabled(mods):
+    os.makedirs(os.path.dirname(WATCH_STATE_FILE), exist_ok=True)
+    tmp_path = f"{WATCH_STATE_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'auto_enabled': mods}, f)
+    os.replace(tmp_path, WATCH_STATE_FILE)
+
+def champion_skins(folder):
+    """A champion's installed base skins, in name order"""
+    return sorted(
+        skin for skin, record in load_installed_manifest().items()
+        if classify_member(record['member']) == (folder, "skins")
+    )
+
+def enable_champion_mods(folder):
+    """
+    Switch the profile to one skin for a champion: the skin watch mode enabled
+    for the previous champion is disabled, a skin of this champion already
+    picked in Manage Mods is kept, and otherwise its first base skin is enabled.
+    Returns the champion's enabled skin, or None if it has none installed.
+    """
+    auto_enabled = set(_load_auto_enabled())
+    enabled = [mod for mod in load_enabled_mods() if mod not in auto_enabled]
+    skins = champion_skins(folder)
+    selected = next((mod for mod in enabled if mod in skins), None)
+    added = []
+    if not selected and skins:
+        selected = skins[0]
+        added.append(selected)
+    save_enabled_mods(enabled + added)
+    _save_auto_enabled(added)
+    return selected
+
+def stage_champion(champion, skip_chromas=False, jobs=None, game_path=None, cancel_event=None):
+    """
+    Install a champion's skins, enable one of them and, given the game path,
+    build the overlay. Returns the repository folder used
+    """
+    # The LCU reports numeric keys, sparse fetch resolves display names
+    champ = find_champion(champion)
+    source = champion_source(champ['name'] if champ else champion, skip_chromas, jobs)
+    if not source:
+        raise RuntimeError("Skins repository unavailable")
+    folder, zip_path = source
+    counts = install_skins(folder, skip_chromas, jobs=jobs, zip_path=zip_path)
+    if counts['failed']:
+        raise RuntimeError(f"{counts['failed']} skins failed to install")
+    if not any(counts.values()):
+        raise RuntimeError(f"No skins found for {folder}")
+    selected = enable_champion_mods(folder)
+    # Extracts skins evicted by the disk budget and marks the champion's skins as used
+    apply_on_demand(load_enabled_mods(), jobs)
+    if game_path and build_overlay(game_path, cancel_event=cancel_event) is None:
+        raise RuntimeError("Building the overlay was stopped")
+    logger.info(
+        f"Staged {folder}: {counts['installed']} installed, {counts['skipped']} unchanged, "
+        f"{counts['repaired']} repaired, {selected} enabled"
+    )
+    return folder
+
+def watch_champion_select(sources, skip_chromas=False, jobs=None, stop_event=None,
+                          min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL,
+                          backoff=WATCH_BACKOFF, on_ready=None, game_path=None):
+    """
+    Poll the sources until stop_event is set, staging skins for each newly
+    locked-in champion. Given the game path, the overlay is rebuilt for each
+    champion and kept running in the background until the next one.
+    While no source answers, the polling interval grows by backoff up to
+    max_interval; as soon as a client answers it drops back to min_interval so
+    a lock-in is seen within one short poll. A champion whose install fails is
+    retried after a delay that grows by backoff up to WATCH_RETRY_MAX.
+    Args:
+        on_ready: optional callback(champion, folder, latency_seconds)
+    """
+    stop_event = stop_event or threading.Event()
+    interval = min_interval
+    current = None
+    failing, failures, retry_at = None, 0, 0.0
+    overlay = {'thread': None, 'cancel': threading.Event()}
+
+    def stop_overlay():
+        # runoverlay reads the overlay the next build replaces
+        if overlay['thread'] and overlay['thread'].is_alive():
+            overlay['cancel'].set()
+            overlay['thread'].join()
+        overlay['cancel'] = threading.Event()
+
+    def start_overlay():
+        overlay['thread'] = threading.Thread(
+            target=run_overlay, args=(game_path,), kwargs={'cancel_event': overlay['cancel']},
+            name="overlay", daemon=True,
+        )
+        overlay['thread'].start()
+
+    try:
+        while not stop_event.is_set():
+            champion = None
+            for poll in sources:
+                champion = poll()
+                if champion is not None:
+                    break
+
+            if champion is None:
+                interval = min(interval * backoff, max_interval)
+            else:
+                interval = min_interval
+
+            if champion and champion != failing:
+                failing, failures, retry_at = None, 0, 0.0
+
+            if champion and champion != current and time.monotonic() >= retry_at:
+                detected = time.perf_counter()
+                try:
+                    if game_path:
+                        stop_overlay()
+                    folder = stage_champion(champion, skip_chromas, jobs, game_path, overlay['cancel'])
+                    if game_path:
+                        start_overlay()
+                    latency = time.perf_counter() - detected
+                    logger.info(f"{champion} ready {latency * 1000:.0f} ms after lock-in was detected")
+                    if on_ready:
+                        on_ready(champion, folder, latency)
+                    current = champion
+                    failing, failures, retry_at = None, 0, 0.0
+                except Exception as e:
+                    failing, failures = champion, failures + 1
+                    delay = min(min_interval * backoff ** failures, WATCH_RETRY_MAX)
+                    retry_at = time.monotonic() + delay
+                    logger.error(f"Staging {champion} failed, retrying in {delay:.1f}s: {e}")
+            elif champion == "":
+                current = None
+
+            stop_event.wait(interval)
+    finally:
+        stop_overlay()
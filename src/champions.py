@@ -1,15 +1,21 @@
+import os
+import json
 import requests
-from config import LOL_VERSION_URL, CHAMPION_DATA_URL
-from update_checker import get_latest_lol_version
+import http_client
+from config import LOL_VERSION_URL, CHAMPION_DATA_URL, CHAMPION_CATALOG_FILE, REPO_ZIP_PATH, LIVE_CLIENT_URL
+from update_checker import get_latest_lol_version, get_current_lol_version
+from repo_index import load_index
 from logger import setup_logger
+from instrumentation import span
 
 logger = setup_logger(__name__)
 
+_catalog = None
+
 def get_current_champion():
     """Get current in-game champion from local API"""
-    url = "https://127.0.0.1:2999/liveclientdata/playerlist"
     try:
-        response = requests.get(url, verify=False, timeout=3)
+        response = http_client.get(LIVE_CLIENT_URL, verify=False, timeout=3)
         if response.status_code == 200:
             return response.json()[0]['championName']
     except (requests.ConnectionError, requests.Timeout):
@@ -18,15 +24,101 @@ def get_current_champion():
         logger.error(f"Champion detection failed: {e}")
     return None
 
+def normalize_name(name):
+    """Compare champion names ignoring case, spaces and punctuation"""
+    return "".join(c for c in name.lower() if c.isalnum())
+
+def _resolve_folders(catalog):
+    """
+    Map each champion to its folder in the skins repository, matching ddragon
+    display names and ids (e.g. "Nunu & Willump", "MonkeyKing" for Wukong)
+    against the indexed folder names.
+    """
+    if not os.path.exists(REPO_ZIP_PATH):
+        return False
+    index = load_index()
+    folders = {normalize_name(folder): folder for folder in index['champions']}
+    for champ in catalog['champions']:
+        champ['folder'] = folders.get(normalize_name(champ['name'])) or folders.get(normalize_name(champ['id']))
+        if not champ['folder']:
+            logger.warning(f"No repository folder for {champ['name']}")
+    catalog['repo_archive'] = index['archive']
+    return True
+
+def _save_catalog(catalog):
+    tmp_path = f"{CHAMPION_CATALOG_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(catalog, f)
+    os.replace(tmp_path, CHAMPION_CATALOG_FILE)
+
+def load_champion_catalog(version=None):
+    """
+    Champion catalog (names, ids, keys and repository folders) for a LoL version.
+    Served from CHAMPION_CATALOG_FILE when it matches the version, so no network
+    access is needed once a version has been fetched.
+    """
+    global _catalog
+    version = version or get_current_lol_version() or get_latest_lol_version()
+
+    if _catalog is None or _catalog['version'] != version:
+        _catalog = None
+        try:
+            with open(CHAMPION_CATALOG_FILE) as f:
+                cached = json.load(f)
+            if cached.get('version') == version:
+                _catalog = cached
+        except (OSError, ValueError):
+            pass
+
+    if _catalog is None:
+        with span("champion_list_fetch"):
+            champion_data = http_client.get_json(CHAMPION_DATA_URL.format(version=version))
+        _catalog = {
+            'version': version,
+            'champions': [
+                {'id': champ['id'], 'key': champ['key'], 'name': champ['name'], 'folder': None}
+                for champ in sorted(champion_data['data'].values(), key=lambda c: c['name'])
+            ],
+        }
+        _resolve_folders(_catalog)
+        _save_catalog(_catalog)
+        logger.info(f"Cached {len(_catalog['champions'])} champions for {version}")
+    elif os.path.exists(REPO_ZIP_PATH) and _catalog.get('repo_archive') != load_index()['archive']:
+        _resolve_folders(_catalog)
+        _save_catalog(_catalog)
+
+    return _catalog
+
 def get_champion_names():
-    """Fetch all champion names from Riot API"""
+    """Fetch all champion names from the cached catalog or Riot API"""
+    try:
+        return [champ['name'] for champ in load_champion_catalog()['champions']]
+    except Exception as e:
+        logger.error(f"Champion list fetch failed: {e}")
+        return []
+
+def get_champion_folders():
+    """Repository folder for every champion in the catalog, in catalog order"""
     try:
-        version = get_latest_lol_version()
-        champion_data = requests.get(
-            CHAMPION_DATA_URL.format(version=version),
-            timeout=5
-        ).json()
-        return [champ["name"] for champ in champion_data["data"].values()]
+        return [champ['folder'] or champ['name'] for champ in load_champion_catalog()['champions']]
     except Exception as e:
         logger.error(f"Champion list fetch failed: {e}")
         return []
+
+def find_champion(name_or_key):
+    """Look a champion up by display name, id or numeric key"""
+    wanted = normalize_name(str(name_or_key))
+    for champ in load_champion_catalog()['champions']:
+        if wanted in (normalize_name(champ['name']), normalize_name(champ['id']), champ['key']):
+            return champ
+    return None
+
+def resolve_repo_folder(champion):
+    """Repository folder name for a champion, falling back to the name itself"""
+    try:
+        champ = find_champion(champion)
+        if champ and champ['folder']:
+            return champ['folder']
+    except Exception as e:
+        logger.warning(f"Champion catalog unavailable: {e}")
+    return champion
@@ -0,0 +1,89 @@
+"""
+Thin client for the resident daemon (python main.py --daemon):
+
+    python client.py install Ahri
+    python client.py enable "Ahri Skin0" "Ahri Skin1"
+    python client.py list --champion Ahri
+    python client.py stats
+"""
+import sys
+import json
+import time
+import socket
+import argparse
+from config import DAEMON_STATE_FILE
+
+def send(command, **args):
+    """Send one command to the running daemon and return its decoded response"""
+    try:
+        with open(DAEMON_STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        raise ConnectionError("Daemon is not running (start it with: python main.py --daemon)")
+
+    request = {'token': state['token'], 'command': command, 'args': args}
+    with socket.create_connection((state['host'], state['port']), timeout=None) as sock:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+def _print_stats(result):
+    print(f"{'Command':<12}{'Count':>7}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'Max ms':>10}")
+    for name, stat in sorted(result['commands'].items()):
+        print(f"{name:<12}{stat['count']:>7}{stat['mean_ms']:>10.1f}{stat['p50_ms']:>10.1f}"
+              f"{stat['p95_ms']:>10.1f}{stat['max_ms']:>10.1f}")
+    usage = result['usage']
+    print(f"\nInstalled: {usage['skins']} skins, {usage['bytes'] / 1048576:.1f} MB; "
+          f"patching: {'yes' if result['patching'] else 'no'}")
+    trash = result['trash']
+    if trash['running']:
+        print(f"Emptying trash: {trash['files']} files, {trash['bytes'] / 1048576:.1f} MB removed so far")
+
+def main():
+    parser = argparse.ArgumentParser(description="Send commands to the League Skin Manager daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ping")
+    install = sub.add_parser("install")
+    install.add_argument("champion")
+    install.add_argument("--skip-chromas", action="store_true")
+    for name in ("enable", "disable"):
+        sub.add_parser(name).add_argument("mods", nargs="+")
+    listing = sub.add_parser("list")
+    listing.add_argument("--query")
+    listing.add_argument("--champion")
+    listing.add_argument("--page", type=int, default=0)
+    patch = sub.add_parser("patch")
+    patch.add_argument("--game-path")
+    sub.add_parser("unpatch")
+    sub.add_parser("stats")
+    sub.add_parser("shutdown")
+    args = parser.parse_args()
+
+    command_args = {key: value for key, value in vars(args).items() if key != "command" and value is not None}
+    start = time.perf_counter()
+    try:
+        response = send(args.command, **command_args)
+    except ConnectionError as e:
+        print(e)
+        sys.exit(1)
+    round_trip = (time.perf_counter() - start) * 1000
+
+    if not response['ok']:
+        print(f"Error: {response['error']}")
+        sys.exit(1)
+    result = response['result']
+    if args.command == "list":
+        for mod in result['mods']:
+            print(f"{mod['name']} {'[Enabled]' if mod['enabled'] else ''}")
+        print(f"({len(result['mods'])} of {result['total']}, page {result['page'] + 1})")
+    elif args.command == "stats":
+        _print_stats(result)
+    else:
+        print(json.dumps(result, indent=2))
+    print(f"{args.command}: {response.get('ms', 0):.1f} ms in daemon, {round_trip:.1f} ms round trip")
+
+if __name__ == "__main__":
+    main()
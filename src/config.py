@@ -1,7 +1,9 @@
 import os
 import sys
 
-if getattr(sys, 'frozen', False):
+if os.environ.get("LSM_PROJECT_ROOT"):
+    PROJECT_ROOT = os.environ["LSM_PROJECT_ROOT"]
+elif getattr(sys, 'frozen', False):
     PROJECT_ROOT = os.path.dirname(sys.executable)
 else:
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,16 +13,77 @@ DOWNLOAD_DIR = os.path.join(DATA_DIR, "skins")
 INSTALL_DIR = os.path.join(DATA_DIR, "cslol-manager")
 INSTALLED_DIR = os.path.join(PROJECT_ROOT, "data", "cslol-manager", "installed")
 PROFILE_FILE = os.path.join(INSTALLED_DIR, "default_profile.txt")
+INSTALLED_MANIFEST_FILE = os.path.join(INSTALLED_DIR, "skins_manifest.json")
 LOG_DIR = os.path.join(PROJECT_ROOT, "logs")
 LOL_VERSION_FILE = os.path.join(DATA_DIR, "lol_version.txt")
 VERSION_FILE = os.path.join(INSTALL_DIR, "version.txt")
 REPO_ZIP_PATH = os.path.join(DOWNLOAD_DIR, "lol-skins-main.zip")
+BLOB_STORE_DIR = os.path.join(DATA_DIR, "blobs")
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
+CHAMPION_CATALOG_FILE = os.path.join(DATA_DIR, "champions.json")
+SPARSE_CACHE_DIR = os.path.join(DOWNLOAD_DIR, "sparse")
+# Same volume as INSTALLED_DIR so staged skins are committed with a rename
+STAGING_DIR = os.path.join(INSTALL_DIR, ".staging")
+BATCH_JOURNAL_FILE = os.path.join(DATA_DIR, "batch_journal.json")
+WATCH_STATE_FILE = os.path.join(DATA_DIR, "watch_state.json")
+DAEMON_STATE_FILE = os.path.join(DATA_DIR, "daemon.json")
+# Outside DATA_DIR so the whole data directory can be renamed into it
+TRASH_DIR = os.path.join(PROJECT_ROOT, ".trash")
+OVERLAY_DIR = os.path.join(INSTALL_DIR, "profiles", "default")
+OVERLAY_FINGERPRINT_FILE = os.path.join(OVERLAY_DIR, "fingerprint.txt")
+# Overridable so a stub mod-tools can stand in for the real executable
+MOD_TOOLS_PATH = os.environ.get("LSM_MOD_TOOLS") or os.path.join(INSTALL_DIR, "cslol-tools", "mod-tools.exe")
 
 LOL_VERSION_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
 CHAMPION_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/champion.json"
+LIVE_CLIENT_URL = "https://127.0.0.1:2999/liveclientdata/playerlist"
+LCU_CHAMPION_URL = "{protocol}://127.0.0.1:{port}/lol-champ-select/v1/current-champion"
 GITHUB_RELEASES_URL = "https://api.github.com/repos/LeagueToolkit/cslol-manager/releases/latest"
 SKINS_REPO_URL = "https://github.com/darkseal-org/lol-skins/archive/refs/heads/main.zip"
+SKINS_TREE_URL = "https://api.github.com/repos/darkseal-org/lol-skins/git/trees/main?recursive=1"
+SKINS_RAW_URL = "https://raw.githubusercontent.com/darkseal-org/lol-skins/main/{path}"
 
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-os.makedirs(INSTALL_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
+DEFAULT_JOBS = os.cpu_count() or 1
+INNER_ZIP_SPOOL_THRESHOLD = 8 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_SEGMENTS = 4
+DEDUP_STORE_ENABLED = False
+HTTP_CACHE_TTL = 15 * 60
+HTTP_TIMEOUT = (5, 30)
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+HTTP_MAX_HOSTS = 8
+HTTP_MAX_PER_HOST = 8
+HTTP_MEMO_SIZE = 32
+WATCH_MIN_INTERVAL = 0.25
+WATCH_MAX_INTERVAL = 5.0
+WATCH_BACKOFF = 1.5
+WATCH_RETRY_MAX = 60.0  # Longest wait before retrying a champion whose install failed
+LOG_FILE_NAME = "app.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_BATCH_SIZE = 50
+MOD_PAGE_SIZE = 40
+# Chromas are registered at install time and only extracted once enabled
+LAZY_CHROMAS = True
+# Fetch single champions file by file while the full repository zip is absent
+SPARSE_FETCH = True
+SPARSE_FETCH_WORKERS = 8
+BATCH_CHECKPOINT_INTERVAL = 5.0
+# Budget for extracted skins; least recently used ones that are not enabled are
+# evicted past it and extracted again on enable. None disables a limit; the
+# count limit is off by default as a full install of base skins nears 2000.
+INSTALLED_MAX_BYTES = 10 * 1024 * 1024 * 1024
+INSTALLED_MAX_SKINS = None
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 0  # 0 picks a free port, published in DAEMON_STATE_FILE
+DAEMON_LATENCY_SAMPLES = 1000
+PATCH_BUILD_TIMEOUT = 30 * 60
+PATCH_IDLE_TIMEOUT = 5 * 60
+PATCH_TERMINATE_GRACE = 5
+
+def ensure_dirs():
+    """Create the data and log directories. Entry points call this; importing config has no side effects."""
+    for directory in (DOWNLOAD_DIR, INSTALL_DIR, LOG_DIR):
+        os.makedirs(directory, exist_ok=True)
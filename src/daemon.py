@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import secrets
+import threading
+import socketserver
+from collections import deque
+from config import (
+    DAEMON_HOST,
+    DAEMON_PORT,
+    DAEMON_STATE_FILE,
+    DAEMON_LATENCY_SAMPLES,
+    REPO_ZIP_PATH,
+    MOD_PAGE_SIZE,
+)
+from logger import setup_logger
+import instrumentation
+from champions import load_champion_catalog
+from repo_index import load_index
+from sparse_fetch import champion_source
+from skin_installer import install_skins, keep_zip_handles, apply_on_demand, enforce_budget, installed_usage
+from trash import trash_progress
+import mod_manager
+
+logger = setup_logger(__name__)
+
+# Requests and responses are single JSON lines:
+#   -> {"token": ..., "command": "install", "args": {"champion": "Ahri"}}
+#   <- {"ok": true, "result": {...}, "ms": 3.1}  or  {"ok": false, "error": "..."}
+
+_commands = {}
+_latencies = {}
+_latencies_lock = threading.Lock()
+# Commands touching installed skins or the profile run one at a time, and not
+# while mkoverlay is reading INSTALLED_DIR
+_state_lock = threading.Lock()
+_patch = {'thread': None, 'cancel': None, 'game_path': None, 'building': False}
+_started_at = time.time()
+
+def command(name, exclusive=True):
+    def register(fn):
+        _commands[name] = (fn, exclusive)
+        return fn
+    return register
+
+@command("ping", exclusive=False)
+def _ping(jobs):
+    return {'pid': os.getpid(), 'uptime': time.time() - _started_at}
+
+@command("install")
+def _install(jobs, champion, skip_chromas=False):
+    start = time.time()
+    source = champion_source(champion, skip_chromas, jobs)
+    if not source:
+        raise RuntimeError("Skins repository unavailable")
+    folder, zip_path = source
+    with instrumentation.span("champion_install"):
+        counts = install_skins(folder, skip_chromas, jobs=jobs, zip_path=zip_path)
+    counts['evicted'] = enforce_budget(mod_manager.load_enabled_mods(), keep_since=start)
+    return dict(counts, folder=folder)
+
+def _update_profile(enabled_mods, jobs):
+    mod_manager.save_enabled_mods(enabled_mods)
+    result = apply_on_demand(enabled_mods, jobs)
+    result['enabled'] = len(enabled_mods)
+    return result
+
+@command("enable")
+def _enable(jobs, mods):
+    return _update_profile(mod_manager.enable_mods(mod_manager.load_enabled_mods(), mods), jobs)
+
+@command("disable")
+def _disable(jobs, mods):
+    return _update_profile(mod_manager.disable_mods(mod_manager.load_enabled_mods(), mods), jobs)
+
+@command("list", exclusive=False)
+def _list(jobs, query=None, champion=None, page=0, page_size=MOD_PAGE_SIZE):
+    mods = mod_manager.filter_mods(mod_manager.get_available_mods(), query, champion)
+    enabled = set(mod_manager.load_enabled_mods())
+    start = page * page_size
+    return {
+        'total': len(mods),
+        'page': page,
+        'mods': [{'name': mod, 'enabled': mod in enabled} for mod in mods[start:start + page_size]],
+    }
+
+def _patch_worker(game_path, cancel):
+    with _state_lock:
+        _patch['building'] = True
+        try:
+            ready = mod_manager.build_overlay(game_path, cancel_event=cancel)
+        finally:
+            _patch['building'] = False
+    if ready is not None and not cancel.is_set():
+        mod_manager.run_overlay(game_path, cancel_event=cancel)
+
+@command("patch")
+def _start_patch(jobs, game_path=None):
+    if _patch['thread'] and _patch['thread'].is_alive():
+        return {'started': False, 'running': True, 'game_path': _patch['game_path']}
+    game_path = game_path or mod_manager.detect_game_path()
+    if not game_path:
+        raise RuntimeError("Game path not found, pass one explicitly")
+    cancel = threading.Event()
+    thread = threading.Thread(
+        target=_patch_worker, args=(game_path, cancel), name="patcher", daemon=True,
+    )
+    _patch.update(thread=thread, cancel=cancel, game_path=game_path)
+    thread.start()
+    return {'started': True, 'running': True, 'game_path': game_path}
+
+@command("unpatch", exclusive=False)
+def _stop_patch(jobs, wait=10):
+    thread = _patch['thread']
+    if not thread or not thread.is_alive():
+        return {'running': False}
+    _patch['cancel'].set()
+    thread.join(wait)
+    return {'running': thread.is_alive()}
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+@command("stats", exclusive=False)
+def _stats(jobs):
+    """Per-command latency in milliseconds, pipeline stage totals and disk usage"""
+    with _latencies_lock:
+        latencies = {name: sorted(samples) for name, samples in _latencies.items()}
+    return {
+        'commands': {
+            name: {
+                'count': len(samples),
+                'mean_ms': sum(samples) / len(samples) * 1000,
+                'p50_ms': _percentile(samples, 0.5) * 1000,
+                'p95_ms': _percentile(samples, 0.95) * 1000,
+                'max_ms': samples[-1] * 1000,
+            }
+            for name, samples in latencies.items()
+        },
+        'stages': instrumentation.summary(),
+        'usage': installed_usage(),
+        'patching': bool(_patch['thread'] and _patch['thread'].is_alive()),
+        'building_overlay': _patch['building'],
+        'trash': trash_progress(),
+    }
+
+def dispatch(request, jobs=None):
+    """Run one request, recording its latency under the command name"""
+    name = request.get('command')
+    if name not in _commands:
+        return {'ok': False, 'error': f"Unknown command: {name}"}
+    fn, exclusive = _commands[name]
+
+    start = time.perf_counter()
+    try:
+        if exclusive:
+            if not _state_lock.acquire(blocking=False):
+                if _patch['building']:
+                    raise RuntimeError("The overlay is being built, try again once it is done")
+                _state_lock.acquire()
+            try:
+                result = fn(jobs, **request.get('args', {}))
+            finally:
+                _state_lock.release()
+        else:
+            result = fn(jobs, **request.get('args', {}))
+        response = {'ok': True, 'result': result}
+    except Exception as e:
+        logger.error(f"Daemon command {name} failed: {e}")
+        response = {'ok': False, 'error': str(e)}
+    seconds = time.perf_counter() - start
+
+    with _latencies_lock:
+        _latencies.setdefault(name, deque(maxlen=DAEMON_LATENCY_SAMPLES)).append(seconds)
+    response['ms'] = seconds * 1000
+    return response
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._reply({'ok': False, 'error': "Malformed request"})
+                continue
+            if not secrets.compare_digest(str(request.get('token', "")), self.server.token):
+                self._reply({'ok': False, 'error': "Invalid token"})
+                return
+            if request.get('command') == "shutdown":
+                self._reply({'ok': True, 'result': {'stopping': True}})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            self._reply(dispatch(request, self.server.jobs))
+
+    def _reply(self, response):
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def _write_state(server):
+    host, port = server.server_address[:2]
+    state = {'host': host, 'port': port, 'token': server.token, 'pid': os.getpid()}
+    tmp_path = f"{DAEMON_STATE_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    if os.name != "nt":
+        os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, DAEMON_STATE_FILE)
+
+def warm_up():
+    """Load everything a command would otherwise parse on first use"""
+    with instrumentation.span("daemon.warm_up"):
+        keep_zip_handles(True, preload=[REPO_ZIP_PATH])
+        if os.path.exists(REPO_ZIP_PATH):
+            load_index()
+        try:
+            load_champion_catalog()
+        except Exception as e:
+            logger.warning(f"Champion catalog unavailable: {e}")
+        mod_manager.get_available_mods()
+
+def serve(jobs=None, host=DAEMON_HOST, port=DAEMON_PORT):
+    """Run the resident service until a shutdown command or Ctrl+C"""
+    warm_up()
+    server = DaemonServer((host, port), RequestHandler)
+    server.token = secrets.token_hex(16)
+    server.jobs = jobs
+    _write_state(server)
+    logger.info(f"Daemon listening on {server.server_address[0]}:{server.server_address[1]}")
+    print(f"Daemon listening on {server.server_address[0]}:{server.server_address[1]}. Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if _patch['cancel']:
+            _patch['cancel'].set()
+        keep_zip_handles(False)
+        if os.path.exists(DAEMON_STATE_FILE):
+            os.remove(DAEMON_STATE_FILE)
+        logger.info("Daemon stopped")
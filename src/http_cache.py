@@ -0,0 +1,64 @@
+import os
+import json
+import time
+import hashlib
+import http_client
+from config import HTTP_CACHE_DIR, HTTP_CACHE_TTL
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _cache_path(url):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+def _load(url):
+    try:
+        with open(_cache_path(url)) as f:
+            entry = json.load(f)
+        return entry if entry.get('url') == url else None
+    except (OSError, ValueError):
+        return None
+
+def _save(entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    path = _cache_path(entry['url'])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+def get_json(url, ttl=HTTP_CACHE_TTL):
+    """
+    Fetch a JSON document through the on-disk cache.
+    Entries younger than ttl seconds are returned without any request; older
+    ones are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged document costs a single 304 round-trip.
+    """
+    entry = _load(url)
+    now = time.time()
+    if entry and now - entry['fetched_at'] < ttl:
+        return entry['body']
+
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    response = http_client.get(url, headers=headers)
+    if response.status_code == 304 and entry:
+        logger.info(f"Not modified: {url}")
+        entry['fetched_at'] = now
+        _save(entry)
+        return entry['body']
+
+    response.raise_for_status()
+    body = response.json()
+    _save({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': now,
+        'body': body,
+    })
+    return body
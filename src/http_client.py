@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    HTTP_TIMEOUT,
+    HTTP_RETRIES,
+    HTTP_BACKOFF,
+    HTTP_MAX_HOSTS,
+    HTTP_MAX_PER_HOST,
+    HTTP_MEMO_SIZE,
+)
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+LOCAL_PREFIXES = ("http://127.0.0.1:", "https://127.0.0.1:")
+
+_session = None
+_session_lock = threading.Lock()
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def get_session():
+    """Process-wide pooled session with retries, shared by every network call"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD"]),
+                respect_retry_after_header=True,
+            )
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_MAX_HOSTS,
+                pool_maxsize=HTTP_MAX_PER_HOST,
+                max_retries=retry,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Local endpoints (live client API) should fail fast, not back off
+            for prefix in LOCAL_PREFIXES:
+                session.mount(prefix, HTTPAdapter(max_retries=0))
+            _session = session
+        return _session
+
+def request(method, url, **kwargs):
+    """Issue a request on the shared session with the default timeout budget"""
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return get_session().request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def head(url, **kwargs):
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, **kwargs)
+
+def get_json(url, memo=True, **kwargs):
+    """GET and decode a JSON document, memoized for the rest of the process"""
+    if memo:
+        with _memo_lock:
+            if url in _memo:
+                _memo.move_to_end(url)
+                return _memo[url]
+
+    response = get(url, **kwargs)
+    response.raise_for_status()
+    body = response.json()
+
+    if memo:
+        with _memo_lock:
+            _memo[url] = body
+            while len(_memo) > HTTP_MEMO_SIZE:
+                _memo.popitem(last=False)
+    return body
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from config import LOG_DIR
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TIMINGS_FILE = os.path.join(LOG_DIR, "timings.json")
+
+_stats = {}
+_stats_lock = threading.Lock()
+_profiler = None
+
+def record(name, seconds, cpu_seconds=0.0, nbytes=0, files=0):
+    """Fold one measurement into the per-stage totals"""
+    with _stats_lock:
+        stage = _stats.setdefault(name, {
+            'count': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'max_seconds': 0.0, 'bytes': 0, 'files': 0,
+        })
+        stage['count'] += 1
+        stage['seconds'] += seconds
+        stage['cpu_seconds'] += cpu_seconds
+        stage['max_seconds'] = max(stage['max_seconds'], seconds)
+        stage['bytes'] += nbytes
+        stage['files'] += files
+
+@contextmanager
+def span(name):
+    """
+    Time a pipeline stage. The yielded dict takes 'bytes' and 'files' counts.
+    CPU time of the current thread is recorded next to wall time, so a stage
+    whose CPU share is low is waiting on network or disk.
+    """
+    counters = {'bytes': 0, 'files': 0}
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield counters
+    finally:
+        record(
+            name,
+            time.perf_counter() - start,
+            time.thread_time() - cpu_start,
+            counters['bytes'],
+            counters['files'],
+        )
+
+def summary():
+    """Per-stage totals with derived throughput and CPU share"""
+    with _stats_lock:
+        stages = {name: dict(stage) for name, stage in _stats.items()}
+    for stage in stages.values():
+        seconds = stage['seconds']
+        stage['mb_per_s'] = stage['bytes'] / 1048576 / seconds if seconds and stage['bytes'] else None
+        stage['files_per_s'] = stage['files'] / seconds if seconds and stage['files'] else None
+        stage['cpu_share'] = stage['cpu_seconds'] / seconds if seconds else None
+    return stages
+
+def format_table(stages):
+    lines = [f"{'Stage':<24}{'Count':>7}{'Total s':>10}{'Max s':>9}{'CPU %':>7}{'Files':>9}{'MB':>10}{'MB/s':>9}"]
+    for name, stage in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+        cpu = f"{stage['cpu_share'] * 100:.0f}" if stage['cpu_share'] is not None else "-"
+        rate = f"{stage['mb_per_s']:.1f}" if stage['mb_per_s'] else "-"
+        lines.append(
+            f"{name:<24}{stage['count']:>7}{stage['seconds']:>10.2f}{stage['max_seconds']:>9.2f}"
+            f"{cpu:>7}{stage['files']:>9}{stage['bytes'] / 1048576:>10.1f}{rate:>9}"
+        )
+    return "\n".join(lines)
+
+def start_profiling():
+    """Enable cProfile and tracemalloc for the rest of the run"""
+    global _profiler
+    import cProfile
+    import tracemalloc
+    tracemalloc.start()
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    logger.info("Profiling enabled")
+
+def _stop_profiling():
+    """Write the cProfile stats and top allocation sites next to the logs"""
+    global _profiler
+    import tracemalloc
+    _profiler.disable()
+    profile_path = os.path.join(LOG_DIR, "profile.prof")
+    _profiler.dump_stats(profile_path)
+    _profiler = None
+
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocations_path = os.path.join(LOG_DIR, "allocations.txt")
+    with open(allocations_path, "w") as f:
+        f.write(f"Current: {current} bytes, peak: {peak} bytes\n\n")
+        for stat in snapshot.statistics("lineno")[:50]:
+            f.write(f"{stat}\n")
+    return {'profile': profile_path, 'allocations': allocations_path, 'traced_peak_bytes': peak}
+
+def report(print_table=True):
+    """Write the run's timings to TIMINGS_FILE and optionally print a summary table"""
+    stages = summary()
+    profiling = _stop_profiling() if _profiler else None
+    if not stages and not profiling:
+        return None
+
+    result = {'finished_at': time.strftime("%Y-%m-%dT%H:%M:%S"), 'stages': stages, 'profiling': profiling}
+    with open(TIMINGS_FILE, "w") as f:
+        json.dump(result, f, indent=2)
+
+    if print_table and stages:
+        print("\n" + format_table(stages))
+        print(f"Timings written to {TIMINGS_FILE}")
+    return result
@@ -1,22 +1,75 @@
-import logging
 import os
-from config import LOG_DIR
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import LOG_DIR, LOG_FILE_NAME, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_BATCH_SIZE
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_queue = None
+_listener = None
+_setup_lock = threading.Lock()
+
+def _start_listener():
+    """Start the single background writer shared by every module logger"""
+    global _queue, _listener
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        os.path.join(LOG_DIR, LOG_FILE_NAME),
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(logging.Formatter(FORMAT))
+
+    _queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
 def setup_logger(name):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    with _setup_lock:
+        if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            return logger
+        if _listener is None:
+            _start_listener()
 
-    # File handler
-    file_handler = logging.FileHandler(os.path.join(LOG_DIR, f"{name}.log"))
-    file_handler.setFormatter(formatter)
+        logger.setLevel(logging.INFO)
 
-    # Console handler (only errors)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.ERROR)
-    console_handler.setFormatter(formatter)
+        # File output goes through the queue, written by the listener thread
+        logger.addHandler(QueueHandler(_queue))
+
+        # Console handler (only errors)
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.ERROR)
+        console_handler.setFormatter(logging.Formatter(FORMAT))
+        logger.addHandler(console_handler)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
     return logger
+
+class LineBatcher:
+    """Fold repetitive per-item info lines into one line per batch of items"""
+
+    def __init__(self, logger, label, size=LOG_BATCH_SIZE):
+        self.logger = logger
+        self.label = label
+        self.size = size
+        self.items = []
+
+    def add(self, item):
+        if self.size <= 1:
+            self.logger.info(f"{self.label}: {item}")
+            return
+        self.items.append(item)
+        if len(self.items) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.items:
+            self.logger.info(f"{self.label} ({len(self.items)}): {', '.join(self.items)}")
+            self.items = []
@@ -1,15 +1,25 @@
 import os
 import time
-import shutil
-import subprocess
-import ctypes
-from ctypes import wintypes
-from config import PROJECT_ROOT, DOWNLOAD_DIR, INSTALL_DIR, LOG_DIR, DATA_DIR
+
+STARTED_AT = time.perf_counter()
+
+import argparse
+from config import (
+    PROJECT_ROOT,
+    DOWNLOAD_DIR,
+    INSTALL_DIR,
+    LOG_DIR,
+    DATA_DIR,
+    DEFAULT_JOBS,
+    LAZY_CHROMAS,
+    ensure_dirs,
+)
 from logger import setup_logger
-from champions import get_current_champion, get_champion_names
-from skin_downloader import download_repo
-from skin_installer import install_skins
-from update_checker import check_and_update
+# Modules that pull in requests, zipfile or the repository index are imported
+# by the menu option that needs them, so the menu appears without waiting on them
+import blob_store
+import instrumentation
+import trash
 
 APP_MUTEX_NAME = "{LeagueSkinManagerVN}"
 
@@ -17,15 +27,18 @@ logger = setup_logger(__name__)
 
 def verify_paths():
     """Ensure all required directories exist"""
-    required_dirs = [DOWNLOAD_DIR, INSTALL_DIR, LOG_DIR]
-    for directory in required_dirs:
-        os.makedirs(directory, exist_ok=True)
+    ensure_dirs()
+    for directory in [DOWNLOAD_DIR, INSTALL_DIR, LOG_DIR]:
         logger.info(f"Verified directory: {directory}")
 
 def ensure_single_instance():
     """Ensure only one instance of the application runs at a time"""
+    if os.name != "nt":
+        return True
     logger.info("Checking for existing application instance...")
 
+    import ctypes
+    from ctypes import wintypes
     kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
     CreateMutexW = kernel32.CreateMutexW
     CreateMutexW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.LPCWSTR]
@@ -46,17 +59,53 @@ def ensure_single_instance():
     return True
 
 
-def process_champion(champion, skip_chromas=False):
-    """Full processing pipeline for a champion"""
-    logger.info(f"Processing {champion}")
-
-    if not download_repo():
-        logger.error("Failed to download skins repository")
-        return 0
+def process_champion(champion, skip_chromas=False, jobs=None):
+    """Full processing pipeline for a champion. Returns the install counts, or None if no skins could be fetched"""
+    from sparse_fetch import champion_source
+    from skin_installer import install_skins, enforce_budget
+    from mod_manager import load_enabled_mods
 
-    installed = install_skins(champion, skip_chromas)
-    logger.info(f"Installed {installed} skins for {champion}")
-    return installed
+    logger.info(f"Processing {champion}")
+    start = time.time()
+
+    source = champion_source(champion, skip_chromas, jobs)
+    if not source:
+        print(f"Could not fetch skins for {champion}")
+        return None
+    folder, zip_path = source
+
+    with instrumentation.span("champion_install"):
+        counts = install_skins(folder, skip_chromas, jobs=jobs, zip_path=zip_path)
+    enforce_budget(load_enabled_mods(), keep_since=start)
+    summary = (
+        f"{champion}: {counts['installed']} installed, {counts['skipped']} unchanged, "
+        f"{counts['repaired']} repaired, {counts['registered']} chromas available on demand"
+    )
+    if counts['failed']:
+        summary += f", {counts['failed']} failed"
+    logger.info(summary)
+    print(summary)
+    return counts
+
+def watch_mode(jobs=None):
+    """Stage skins for every champion locked in during champion select"""
+    from champion_watcher import watch_champion_select, lcu_source, live_client_source
+    from mod_manager import detect_game_path
+
+    sources = []
+    game_path = detect_game_path()
+    if game_path:
+        sources.append(lcu_source(game_path))
+    sources.append(live_client_source())
+
+    if not game_path:
+        print("Game path not found: skins are installed and enabled, but the overlay is not built.")
+
+    def report(champion, folder, latency):
+        print(f"{folder} ready {latency * 1000:.0f} ms after lock-in")
+
+    print("Watching for champion lock-in. Press Ctrl+C to stop.")
+    watch_champion_select(sources, jobs=jobs, on_ready=report, game_path=game_path)
 
 def factory_reset():
     """Reset all downloaded and installed content"""
@@ -64,9 +113,10 @@ def factory_reset():
 
     try:
         if os.path.exists(DATA_DIR):
-            shutil.rmtree(DATA_DIR)
-            os.makedirs(DOWNLOAD_DIR)
-            os.makedirs(INSTALL_DIR)
+            trash.move_to_trash(DATA_DIR)
+            os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+            os.makedirs(INSTALL_DIR, exist_ok=True)
+            trash.empty_trash_in_background()
             logger.info("Reset CSLOL Manager installation")
 
         return True
@@ -74,7 +124,7 @@ def factory_reset():
         logger.error(f"Factory reset failed: {e}")
         return False
 
-def main_menu():
+def main_menu(jobs=None):
     """Command-line interface"""
     print("\nLeague Skin Manager VN")
     print("1. Install skins for a single champion (with chromas)")
@@ -88,25 +138,47 @@ def main_menu():
         choice = input("\nSelect option: ").strip()
 
         if choice == "1":
+            from champions import get_current_champion
             champion = get_current_champion()
             if not champion:
                 print("Champion detection failed. Enter manually:")
                 champion = input("Champion name: ").strip()
 
             if champion:
-                process_champion(champion, skip_chromas=False)
+                process_champion(champion, skip_chromas=False, jobs=jobs)
             else:
                 print("Invalid champion name")
 
         elif choice == "2":
-            print("\nWARNING: Installing chromas for all champions may cause CSLOL Manager to become slow/laggy.")
-            print("If CSLOL Manager becomes unresponsive, perform a Factory Reset (option 3).")
+            from champions import get_champion_names, get_champion_folders
+            from skin_downloader import download_repo
+            from skin_installer import install_all_skins, load_batch_journal, clear_batch_journal, enforce_budget
+            from mod_manager import load_enabled_mods
+
+            journal = load_batch_journal()
+            if journal:
+                print(f"\nAn interrupted install finished {len(journal['done'])}/{len(journal['champions'])} champions.")
+                resume = ""
+                while resume.lower() not in ["y", "n"]:
+                    resume = input("Resume it? (y/n): ").strip()
+                if resume.lower() == "n":
+                    clear_batch_journal()
+                    journal = None
+
+            if journal:
+                skip_chromas = journal['skip_chromas']
+            else:
+                if LAZY_CHROMAS:
+                    print("\nChromas are only extracted once you enable them in Manage Mods (option 5).")
+                else:
+                    print("\nWARNING: Installing chromas for all champions may cause CSLOL Manager to become slow/laggy.")
+                    print("If CSLOL Manager becomes unresponsive, perform a Factory Reset (option 3).")
 
-            install_chromas = ""
-            while install_chromas.lower() not in ["y", "n"]:
-                install_chromas = input("Include chromas? (y/n): ").strip()
+                install_chromas = ""
+                while install_chromas.lower() not in ["y", "n"]:
+                    install_chromas = input("Include chromas? (y/n): ").strip()
 
-            skip_chromas = (install_chromas.lower() == "n")
+                skip_chromas = (install_chromas.lower() == "n")
 
             champions = get_champion_names()
             if not champions:
@@ -116,11 +188,28 @@ def main_menu():
             print(f"Found {len(champions)} champions")
             start = time.time()
 
-            for i, champ in enumerate(champions, 1):
-                print(f"\nProcessing {i}/{len(champions)}: {champ}")
-                process_champion(champ, skip_chromas=skip_chromas)
+            if not download_repo():
+                print("Failed to download skins repository")
+                continue
 
-            print(f"\nCompleted in {time.time()-start:.1f} seconds")
+            def report(i, total, champ, counts):
+                print(f"Processed {i}/{total}: {champ} ({counts['installed']} installed, "
+                      f"{counts['skipped']} unchanged, {counts['repaired']} repaired)")
+
+            with instrumentation.span("batch_install"):
+                results = install_all_skins(
+                    get_champion_folders(), skip_chromas=skip_chromas, progress=report, jobs=jobs, resume=True
+                )
+            evicted = enforce_budget(load_enabled_mods(), keep_since=start)
+
+            totals = {key: sum(counts[key] for counts in results.values())
+                      for key in ('installed', 'skipped', 'repaired', 'registered')}
+            print(f"\nInstalled {totals['installed']} skins, {totals['skipped']} unchanged, "
+                  f"{totals['repaired']} repaired, {totals['registered']} chromas available on demand")
+            if evicted:
+                print(f"{evicted} least recently used skins were removed to stay within the disk budget; "
+                      f"they are extracted again when enabled")
+            print(f"Completed in {time.time()-start:.1f} seconds")
 
         elif choice == "3":
             if factory_reset():
@@ -135,6 +224,7 @@ def main_menu():
                 cslol_path = os.path.join(INSTALL_DIR, "cslol-manager.exe")
 
                 if os.path.exists(cslol_path):
+                    import subprocess
                     print(f"Launching CSLOL Manager")
                     subprocess.Popen([cslol_path], shell=True)
                 else:
@@ -153,26 +243,83 @@ def main_menu():
         else:
             print("Invalid option")
 
+def parse_args():
+    """Parse command-line settings"""
+    parser = argparse.ArgumentParser(description="League Skin Manager VN")
+    parser.add_argument(
+        "--jobs", type=int, default=DEFAULT_JOBS,
+        help=f"Number of skins extracted concurrently (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "--dedup", action="store_true", default=blob_store.is_enabled(),
+        help="Store identical skin files once and hardlink them into installed mods"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Record cProfile stats and tracemalloc allocations in the logs folder"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Stay in the background and install skins as soon as a champion is locked in"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Stay resident and serve commands from client.py over a local socket"
+    )
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="Skip the update check and go straight to the menu"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    blob_store.set_enabled(args.dedup)
+    if args.profile:
+        instrumentation.start_profiling()
     try:
         if not ensure_single_instance():
             print("Cannot run multiple instances")
             exit(1)
 
         verify_paths()
+        # Finish deleting whatever a previous reset left in the trash
+        trash.empty_trash_in_background()
         os.chdir(PROJECT_ROOT)
-        print("Checking for updates...")
-        update_result = check_and_update()
-        if update_result['lol_version_changed']:
-            print("Skins have been reset")
-        if update_result['manager_updated']:
-            print("CSLOL Manager updated successfully")
-
-        main_menu()
+        if not args.offline:
+            from update_checker import check_and_update
+            print("Checking for updates...")
+            with instrumentation.span("update_check"):
+                update_result = check_and_update()
+            if update_result['lol_version_changed']:
+                synced = update_result['skins_synced']
+                if synced:
+                    print(f"Skins updated: {synced['added']} added, {synced['changed']} changed, "
+                          f"{synced['removed']} removed")
+                else:
+                    print("Skins have been reset")
+            if update_result['sync_failed']:
+                print("Skin update failed, installed skins were kept. It will be retried on next start.")
+            if update_result['manager_updated']:
+                print("CSLOL Manager updated successfully")
+
+        if args.watch:
+            watch_mode(jobs=args.jobs)
+        elif args.daemon:
+            from daemon import serve
+            serve(jobs=args.jobs)
+        else:
+            logger.info(f"Time to menu: {time.perf_counter() - STARTED_AT:.2f}s")
+            main_menu(jobs=args.jobs)
     except KeyboardInterrupt:
         print("\nOperation cancelled")
     except Exception as e:
         logger.exception("Critical error occurred")
         print(f"Error: {e}\nSee logs for details")
     finally:
+        instrumentation.report()
+        progress = trash.trash_progress()
+        if progress['running']:
+            print(f"Old files are still being deleted ({progress['files']} files, "
+                  f"{progress['bytes'] / 1048576:.0f} MB so far); the rest is removed on next start")
         print("Exiting application")
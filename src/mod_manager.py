@@ -1,20 +1,42 @@
 import os
-import subprocess
-import winreg
+import json
+import hashlib
 import sys
-from config import INSTALLED_DIR, PROFILE_FILE, INSTALL_DIR
+try:
+    import winreg
+except ImportError:
+    winreg = None
+from config import (
+    INSTALLED_DIR,
+    PROFILE_FILE,
+    MOD_PAGE_SIZE,
+    MOD_TOOLS_PATH,
+    OVERLAY_DIR,
+    OVERLAY_FINGERPRINT_FILE,
+    PATCH_BUILD_TIMEOUT,
+    PATCH_IDLE_TIMEOUT,
+    LOL_VERSION_FILE,
+    VERSION_FILE,
+    ensure_dirs,
+)
+from instrumentation import span
+from patch_supervisor import run_supervised
+from repo_index import classify_member
+from champions import normalize_name, resolve_repo_folder
+from skin_installer import load_installed_manifest, get_on_demand_skins, apply_on_demand
 
-CSLOL_TOOL_PATH = os.path.join(INSTALL_DIR,"cslol-tools"    , "mod-tools.exe")
+CSLOL_TOOL_PATH = MOD_TOOLS_PATH
 
 def detect_game_path():
     """Attempt to detect the League of Legends game path on Windows."""
-    try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Riot Games, Inc\League of Legends") as key:
-            path, _ = winreg.QueryValueEx(key, "Path")
-            if os.path.exists(os.path.join(path, "League of Legends.exe")):
-                return path
-    except FileNotFoundError:
-        pass
+    if winreg:
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Riot Games, Inc\League of Legends") as key:
+                path, _ = winreg.QueryValueEx(key, "Path")
+                if os.path.exists(os.path.join(path, "League of Legends.exe")):
+                    return path
+        except FileNotFoundError:
+            pass
     default_path = r"C:\Riot Games\League of Legends"
     if os.path.exists(os.path.join(default_path, "League of Legends.exe")):
         return default_path
@@ -24,14 +46,46 @@ def validate_game_path(path):
     """Validate if the game path contains League of Legends.exe."""
     return os.path.exists(os.path.join(path, "League of Legends.exe"))
 
+_catalog_cache = {'mtime_ns': None, 'mods': []}
+
 def get_available_mods():
-    """Retrieve list of available mods from the installed directory."""
-    mods = []
-    if os.path.exists(INSTALLED_DIR):
-        for item in os.listdir(INSTALLED_DIR):
-            if os.path.isdir(os.path.join(INSTALLED_DIR, item)) and item != "META":
-                mods.append(item)
-    return sorted(mods)
+    """Retrieve list of available mods: installed folders plus on-demand skins not yet extracted."""
+    try:
+        mtime_ns = os.stat(INSTALLED_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    # Adding or removing a mod folder, or saving the install manifest, bumps the directory mtime
+    if _catalog_cache['mtime_ns'] == mtime_ns:
+        return _catalog_cache['mods']
+
+    with os.scandir(INSTALLED_DIR) as entries:
+        mods = {
+            entry.name for entry in entries
+            if entry.is_dir() and entry.name != "META" and not entry.name.startswith(".")
+        }
+    mods = sorted(mods.union(get_on_demand_skins()))
+    _catalog_cache.update(mtime_ns=mtime_ns, mods=mods)
+    return mods
+
+def get_mod_champions():
+    """Map installed mod folders to the champion they were installed for."""
+    champions = {}
+    for mod, record in load_installed_manifest().items():
+        member = classify_member(record['member'])
+        if member:
+            champions[mod] = member[0]
+    return champions
+
+def filter_mods(mods, query=None, champion=None, mod_champions=None):
+    """Narrow a mod list by champion (display name, id or folder) and/or case-insensitive substring."""
+    if champion:
+        wanted = normalize_name(resolve_repo_folder(champion))
+        mod_champions = mod_champions if mod_champions is not None else get_mod_champions()
+        mods = [mod for mod in mods if normalize_name(mod_champions.get(mod, "")) == wanted]
+    if query:
+        query = query.lower()
+        mods = [mod for mod in mods if query in mod.lower()]
+    return mods
 
 def load_enabled_mods():
     """Load enabled mods from the default profile file."""
@@ -47,35 +101,203 @@ def save_enabled_mods(enabled_mods):
         for mod in enabled_mods:
             f.write(f"{mod}\n")
 
-def display_mods(available_mods, enabled_mods):
-    """Display available and enabled mods."""
-    print("\nAvailable Mods:")
-    for i, mod in enumerate(available_mods, 1):
-        status = "[Enabled]" if mod in enabled_mods else ""
+def enable_mods(enabled_mods, mods_to_enable):
+    """Append mods to the enabled list, keeping order and skipping duplicates."""
+    seen = set(enabled_mods)
+    result = list(enabled_mods)
+    for mod in mods_to_enable:
+        if mod not in seen:
+            seen.add(mod)
+            result.append(mod)
+    return result
+
+def disable_mods(enabled_mods, mods_to_disable):
+    """Remove mods from the enabled list."""
+    to_disable = set(mods_to_disable)
+    return [mod for mod in enabled_mods if mod not in to_disable]
+
+def display_mods(available_mods, enabled_mods, page=0, page_size=MOD_PAGE_SIZE):
+    """Display one page of available mods with their enabled state."""
+    enabled = enabled_mods if isinstance(enabled_mods, (set, frozenset)) else set(enabled_mods)
+    pages = max(1, -(-len(available_mods) // page_size))
+    page = min(max(page, 0), pages - 1)
+    start = page * page_size
+
+    print(f"\nAvailable Mods (page {page + 1}/{pages}, {len(available_mods)} shown, {len(enabled)} enabled):")
+    for i, mod in enumerate(available_mods[start:start + page_size], start + 1):
+        status = "[Enabled]" if mod in enabled else ""
         print(f"{i}. {mod} {status}")
+    return page
 
 def parse_selection(input_str, available_mods):
-    """Parse user input for mod selection."""
+    """Parse user input for mod selection: 'all', numbers and ranges like 3-40."""
     if input_str.lower() == "all":
         return available_mods
     try:
-        indices = [int(i.strip()) - 1 for i in input_str.split(",") if i.strip()]
+        indices = []
+        for part in input_str.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                first, last = (int(i) for i in part.split("-", 1))
+                indices.extend(range(first - 1, last))
+            else:
+                indices.append(int(part) - 1)
         return [available_mods[i] for i in indices if 0 <= i < len(available_mods)]
     except (ValueError, IndexError):
         print("Invalid selection. Proceeding with no changes.")
         return []
 
-def run_patching(game_path, overlay_dir):
-    """Run the CS LOL patching process."""
-    cmd = [CSLOL_TOOL_PATH, "runoverlay", overlay_dir, PROFILE_FILE, "--game:", game_path]
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def select_mods(available_mods, enabled_mods):
+    """Interactive browse/search/enable/disable loop. Returns the new enabled list."""
+    mod_champions = get_mod_champions()
+    view = available_mods
+    page = 0
+    print("\nCommands: n/p next/previous page, s <text> search, c <champion> filter by champion,")
+    print("          s or c alone clears the filter, e <selection> enable, d <selection> disable,")
+    print("          selections are numbers, ranges (1-20) or 'all' of the shown list; Enter to finish")
+
+    while True:
+        page = display_mods(view, set(enabled_mods), page)
+        command = input("\nMods> ").strip()
+        if not command:
+            return enabled_mods
+
+        action, _, argument = command.partition(" ")
+        action = action.lower()
+        argument = argument.strip()
+
+        if action == "n":
+            page += 1
+        elif action == "p":
+            page -= 1
+        elif action == "s":
+            view = filter_mods(available_mods, query=argument)
+            page = 0
+        elif action == "c":
+            view = filter_mods(available_mods, champion=argument, mod_champions=mod_champions)
+            page = 0
+        elif action == "e":
+            enabled_mods = enable_mods(enabled_mods, parse_selection(argument, view))
+        elif action == "d":
+            enabled_mods = disable_mods(enabled_mods, parse_selection(argument, view))
+        else:
+            print("Unknown command")
+
+def _mod_state(mod, manifest):
+    """What identifies a mod's content: its install record, or its files' sizes and mtimes."""
+    record = manifest.get(mod)
+    if record:
+        return {'crc': record['crc'], 'files': record['files']}
+    state = []
+    mod_path = os.path.join(INSTALLED_DIR, mod)
+    for root, _, files in os.walk(mod_path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            state.append([os.path.relpath(os.path.join(root, name), mod_path), stat.st_size, stat.st_mtime_ns])
+    return sorted(state)
+
+def _read_version(path):
     try:
-        for line in process.stdout:
-            print(line.strip())
-        process.wait()
-    except KeyboardInterrupt:
+        with open(path, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _game_state(game_path):
+    """What identifies the game files and tools an overlay was built against."""
+    try:
+        stat = os.stat(os.path.join(game_path, "League of Legends.exe"))
+        executable = [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        executable = None
+    return {
+        'path': game_path,
+        'executable': executable,
+        'lol_version': _read_version(LOL_VERSION_FILE),
+        'tools_version': _read_version(VERSION_FILE),
+    }
+
+def overlay_fingerprint(game_path, enabled_mods=None):
+    """Hash of the game and mod-tools versions and the enabled mods' contents, in profile order."""
+    enabled_mods = load_enabled_mods() if enabled_mods is None else enabled_mods
+    manifest = load_installed_manifest()
+    state = {
+        'game': _game_state(game_path),
+        'mods': [[mod, _mod_state(mod, manifest)] for mod in enabled_mods],
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _load_overlay_fingerprint():
+    try:
+        with open(OVERLAY_FINGERPRINT_FILE, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _run_tool(args, stage, timeout=None, idle_timeout=None, cancel_event=None):
+    """Run mod-tools under the supervisor. Returns the exit code, or None if it was stopped."""
+    cmd = [CSLOL_TOOL_PATH] + args
+    with span(stage):
+        result = run_supervised(cmd, timeout=timeout, idle_timeout=idle_timeout, cancel_event=cancel_event)
+    if result.get('cancelled'):
         print("\nPatching cancelled by user.")
-        process.terminate()
+        return None
+    if result.get('timed_out'):
+        print(f"\n{args[0]} timed out and was stopped.")
+        return None
+    return result.get('returncode')
+
+def is_overlay_current(game_path, overlay_dir=OVERLAY_DIR):
+    """Whether overlay_dir was built by mkoverlay for the current mods, game and tools."""
+    return os.path.isdir(overlay_dir) and _load_overlay_fingerprint() == overlay_fingerprint(game_path)
+
+def build_overlay(game_path, overlay_dir=OVERLAY_DIR, force=False, cancel_event=None):
+    """
+    Build the overlay for the enabled mods unless the last build used the same
+    mods with the same contents.
+    Returns True when the overlay is ready, False when mkoverlay failed (run_overlay
+    then falls back to the installed mods) and None when the build was stopped.
+    """
+    enabled_mods = load_enabled_mods()
+    fingerprint = overlay_fingerprint(game_path, enabled_mods)
+    if not force and os.path.isdir(overlay_dir) and _load_overlay_fingerprint() == fingerprint:
+        print("Enabled mods unchanged, reusing the cached overlay.")
+        return True
+
+    if os.path.exists(OVERLAY_FINGERPRINT_FILE):
+        os.remove(OVERLAY_FINGERPRINT_FILE)
+    os.makedirs(overlay_dir, exist_ok=True)
+    args = ["mkoverlay", INSTALLED_DIR, overlay_dir, f"--game:{game_path}", f"--mods:{'/'.join(enabled_mods)}"]
+    returncode = _run_tool(args, "overlay_build", PATCH_BUILD_TIMEOUT, PATCH_IDLE_TIMEOUT, cancel_event)
+    if returncode is None:
+        return None
+    if returncode != 0:
+        print("Building the overlay failed.")
+        return False
+
+    with open(OVERLAY_FINGERPRINT_FILE, "w") as f:
+        f.write(fingerprint)
+    return True
+
+def run_overlay(game_path, overlay_dir=OVERLAY_DIR, cancel_event=None):
+    """
+    Apply the built overlay to the game until it is stopped. Without a current
+    overlay, runoverlay is pointed at the installed mods as before overlays were built.
+    """
+    if is_overlay_current(game_path, overlay_dir):
+        args = ["runoverlay", overlay_dir, PROFILE_FILE, f"--game:{game_path}"]
+    else:
+        print("No prebuilt overlay, running the installed mods directly.")
+        args = ["runoverlay", INSTALLED_DIR, PROFILE_FILE, "--game:", game_path]
+    _run_tool(args, "patching", cancel_event=cancel_event)
+
+def run_patching(game_path, overlay_dir=OVERLAY_DIR, cancel_event=None):
+    """Run the CS LOL patching process, rebuilding the overlay only when needed."""
+    if build_overlay(game_path, overlay_dir, cancel_event=cancel_event) is None:
+        return
+    run_overlay(game_path, overlay_dir, cancel_event)
 
 def main():
     game_path = detect_game_path()
@@ -92,25 +314,24 @@ def main():
         print("No mods found in the 'installed' directory.")
         return
 
-    enabled_mods = load_enabled_mods()
-    display_mods(available_mods, enabled_mods)
-
-    enable_input = input("\nSelect mods to enable (numbers separated by commas, or 'all'): ").strip()
-    mods_to_enable = parse_selection(enable_input, available_mods)
-    for mod in mods_to_enable:
-        if mod not in enabled_mods:
-            enabled_mods.append(mod)
-
-    disable_input = input("Select mods to disable (numbers separated by commas, or 'all'): ").strip()
-    mods_to_disable = parse_selection(disable_input, available_mods)
-    enabled_mods = [mod for mod in enabled_mods if mod not in mods_to_disable]
+    enabled_mods = select_mods(available_mods, load_enabled_mods())
 
     save_enabled_mods(enabled_mods)
-    print("Profile updated with enabled mods:", ", ".join(enabled_mods) if enabled_mods else "None")
+    if len(enabled_mods) <= 20:
+        print("Profile updated with enabled mods:", ", ".join(enabled_mods) if enabled_mods else "None")
+    else:
+        print(f"Profile updated with {len(enabled_mods)} enabled mods")
+
+    on_demand = apply_on_demand(enabled_mods)
+    if on_demand['materialized'] or on_demand['evicted']:
+        print(f"Extracted {on_demand['materialized']} chromas, removed {on_demand['evicted']} disabled chromas")
+    if on_demand['budget_evicted']:
+        print(f"{on_demand['budget_evicted']} least recently used skins were removed to stay within the disk budget; "
+              f"they are extracted again when enabled")
 
-    overlay_dir = INSTALLED_DIR
     print("\nStarting patching process. Press Ctrl+C to cancel.")
-    run_patching(game_path, overlay_dir)
+    run_patching(game_path)
 
 if __name__ == "__main__":
+    ensure_dirs()
     main()
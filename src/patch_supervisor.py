@@ -0,0 +1,167 @@
+import re
+import time
+import asyncio
+from config import PATCH_TERMINATE_GRACE
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# mod-tools reports progress as "12/80", "45%" or "Status: ..." lines
+COUNT_PATTERN = re.compile(r"(\d+)\s*/\s*(\d+)")
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+STATUS_PATTERN = re.compile(r"^\s*Status:\s*(.+)$", re.IGNORECASE)
+LINE_SPLIT = re.compile(r"[\r\n]+")
+READ_SIZE = 64 * 1024
+
+class ProgressParser:
+    """Turn raw output lines into event dicts, tracking rate between progress lines."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = None
+
+    def parse(self, stream, line):
+        now = time.perf_counter()
+        event = {'type': 'output', 'stream': stream, 'line': line, 'elapsed': now - self.started}
+
+        status = STATUS_PATTERN.match(line)
+        if status:
+            event.update(type='status', status=status.group(1).strip())
+            return event
+
+        count = COUNT_PATTERN.search(line)
+        percent = PERCENT_PATTERN.search(line)
+        if count and int(count.group(2)) > 0:
+            done, total = int(count.group(1)), int(count.group(2))
+            event.update(type='progress', done=done, total=total, percent=done * 100.0 / total)
+        elif percent:
+            event.update(type='progress', done=None, total=None, percent=float(percent.group(1)))
+        else:
+            return event
+
+        # Rate in items (or percent points) per second since the previous progress line
+        kind = 'count' if event['done'] is not None else 'percent'
+        position = event['done'] if kind == 'count' else event['percent']
+        if self.last and self.last[2] == kind and now > self.last[0] and position >= self.last[1]:
+            event['rate'] = (position - self.last[1]) / (now - self.last[0])
+        else:
+            event['rate'] = None
+        self.last = (now, position, kind)
+        return event
+
+def print_event(event):
+    """Default console reporting: progress and status only, raw output stays in the debug log"""
+    if event['type'] == 'progress':
+        rate = f", {event['rate']:.1f}/s" if event['rate'] else ""
+        if event['total']:
+            print(f"Progress: {event['done']}/{event['total']} ({event['percent']:.0f}%{rate})")
+        else:
+            print(f"Progress: {event['percent']:.0f}%{rate}")
+    elif event['type'] == 'status':
+        print(f"Status: {event['status']}")
+
+async def _drain(reader, stream, parser, on_event, result):
+    """Read a stream to EOF in chunks, emitting one event per line (\\r or \\n terminated)"""
+    pending = ""
+    while True:
+        chunk = await reader.read(READ_SIZE)
+        if not chunk:
+            break
+        result['last_output'] = time.perf_counter()
+        lines = LINE_SPLIT.split(pending + chunk.decode("utf-8", errors="replace"))
+        pending = lines.pop()
+        for line in lines:
+            _emit(stream, line, parser, on_event, result)
+    if pending:
+        _emit(stream, pending, parser, on_event, result)
+
+def _emit(stream, line, parser, on_event, result):
+    line = line.strip()
+    if not line:
+        return
+    logger.debug(f"mod-tools {stream}: {line}")
+    if stream == "stderr":
+        result['stderr_tail'] = (result['stderr_tail'] + [line])[-20:]
+    event = parser.parse(stream, line)
+    if event['type'] in ('progress', 'status'):
+        result['last_event'] = event
+    if on_event:
+        on_event(event)
+
+async def _stop(process, grace):
+    """Ask the process to exit, killing it if it is still running after grace seconds"""
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        logger.warning("mod-tools did not exit after terminate, killing it")
+        process.kill()
+        await process.wait()
+
+async def supervise(cmd, on_event=print_event, timeout=None, idle_timeout=None,
+                    cancel_event=None, grace=PATCH_TERMINATE_GRACE, result=None):
+    """
+    Run cmd, draining stdout and stderr concurrently into parsed events.
+    The process is stopped (terminate, then kill after grace seconds) when
+    timeout elapses, no output arrives for idle_timeout seconds, cancel_event
+    (an asyncio.Event or threading.Event) is set, or the calling task is cancelled.
+    Returns:
+        dict: {returncode, seconds, timed_out, cancelled, last_event, stderr_tail}
+    """
+    result = result if result is not None else {}
+    start = time.perf_counter()
+    result.update(returncode=None, seconds=0.0, timed_out=False, cancelled=False,
+                  last_event=None, stderr_tail=[], last_output=start)
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    parser = ProgressParser()
+    drains = asyncio.gather(
+        _drain(process.stdout, "stdout", parser, on_event, result),
+        _drain(process.stderr, "stderr", parser, on_event, result),
+    )
+    exited = asyncio.ensure_future(process.wait())
+    try:
+        while not exited.done():
+            await asyncio.wait([exited], timeout=0.2)
+            now = time.perf_counter()
+            if cancel_event is not None and cancel_event.is_set():
+                result['cancelled'] = True
+                break
+            if timeout is not None and now - start > timeout:
+                result['timed_out'] = True
+                break
+            if idle_timeout is not None and now - result['last_output'] > idle_timeout:
+                result['timed_out'] = True
+                break
+        if result['timed_out']:
+            logger.error(f"mod-tools timed out after {now - start:.0f}s: {' '.join(cmd[:2])}")
+        await _stop(process, grace)
+        await drains
+    except asyncio.CancelledError:
+        result['cancelled'] = True
+        await _stop(process, grace)
+        drains.cancel()
+        raise
+    finally:
+        exited.cancel()
+        result['returncode'] = process.returncode
+        result['seconds'] = time.perf_counter() - start
+    if result['returncode'] and not (result['cancelled'] or result['timed_out']):
+        tail = "\n".join(result['stderr_tail'])
+        logger.warning(f"mod-tools exited with code {result['returncode']}: {' '.join(cmd[:2])}\n{tail}")
+    return result
+
+def run_supervised(cmd, on_event=print_event, timeout=None, idle_timeout=None, grace=PATCH_TERMINATE_GRACE,
+                   cancel_event=None):
+    """Blocking wrapper around supervise; Ctrl+C stops the process gracefully."""
+    result = {}
+    try:
+        asyncio.run(supervise(cmd, on_event, timeout, idle_timeout, cancel_event, grace, result))
+    except KeyboardInterrupt:
+        result['cancelled'] = True
+    return result
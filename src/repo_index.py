@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import zipfile
+from config import REPO_ZIP_PATH, SPARSE_CACHE_DIR
+from logger import setup_logger
+from instrumentation import span
+
+logger = setup_logger(__name__)
+
+INDEX_FORMAT = 1
+SKINS_PREFIX = "lol-skins-main/skins/"
+TAIL_HASH_BYTES = 64 * 1024
+
+_cache = {}
+
+def archive_key(zip_path=REPO_ZIP_PATH):
+    """Identify an archive by size, mtime and a hash of its central directory tail"""
+    stat = os.stat(zip_path)
+    with open(zip_path, 'rb') as f:
+        f.seek(max(0, stat.st_size - TAIL_HASH_BYTES))
+        tail_hash = hashlib.sha256(f.read()).hexdigest()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'tail_sha256': tail_hash}
+
+def sparse_zip_path(champion):
+    """Where the per-champion archive assembled by sparse_fetch is kept"""
+    return os.path.join(SPARSE_CACHE_DIR, f"{champion}.zip")
+
+def source_zip_for(member_name):
+    """The full repository zip if present, else the champion's sparse archive, else None"""
+    if os.path.exists(REPO_ZIP_PATH):
+        return REPO_ZIP_PATH
+    member = classify_member(member_name)
+    if member and os.path.exists(sparse_zip_path(member[0])):
+        return sparse_zip_path(member[0])
+    return None
+
+def index_path_for(zip_path=REPO_ZIP_PATH):
+    """Sidecar index location for an archive"""
+    return f"{os.path.splitext(zip_path)[0]}.index.json"
+
+def manifest_path_for(zip_path=REPO_ZIP_PATH):
+    """Per-member CRC manifest location for an archive"""
+    return f"{os.path.splitext(zip_path)[0]}.manifest.json"
+
+def skin_folder_name(member_name):
+    """Installed folder name for a skin member"""
+    return os.path.splitext(os.path.basename(member_name))[0]
+
+def classify_member(member_name):
+    """Return (champion, kind) for a skin member, or None for anything else"""
+    if not member_name.startswith(SKINS_PREFIX) or not member_name.endswith(".zip"):
+        return None
+    parts = member_name[len(SKINS_PREFIX):].split("/")
+    if len(parts) < 2:
+        return None
+    return parts[0], ("chromas" if "chromas" in parts[1:-1] else "skins")
+
+def _entry(info):
+    return {
+        'name': info.filename,
+        'offset': info.header_offset,
+        'crc': info.CRC,
+        'compress_size': info.compress_size,
+        'file_size': info.file_size,
+        'compress_type': info.compress_type,
+    }
+
+def build_index(zip_path=REPO_ZIP_PATH):
+    """Scan the repository zip once and write the champion -> member sidecar index"""
+    index_path = index_path_for(zip_path)
+    logger.info(f"Building repository index for {zip_path}")
+    champions = {}
+    with span("repo_index.build") as stage, zipfile.ZipFile(zip_path) as repo_zip:
+        for info in repo_zip.infolist():
+            member = classify_member(info.filename)
+            if not member:
+                continue
+            champion, kind = member
+            group = champions.setdefault(champion, {'skins': [], 'chromas': []})
+            group[kind].append(_entry(info))
+            stage['files'] += 1
+
+    index = {'format': INDEX_FORMAT, 'archive': archive_key(zip_path), 'champions': champions}
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+    save_manifest(index, zip_path)
+
+    _cache[index_path] = index
+    logger.info(f"Indexed {len(champions)} champions")
+    return index
+
+def save_manifest(index, zip_path=REPO_ZIP_PATH):
+    """Record member -> CRC for an archive so a later archive can be diffed against it"""
+    members = {
+        entry['name']: entry['crc']
+        for group in index['champions'].values()
+        for kind in ('skins', 'chromas')
+        for entry in group[kind]
+    }
+    manifest_path = manifest_path_for(zip_path)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'archive': index['archive'], 'members': members}, f)
+    os.replace(tmp_path, manifest_path)
+
+def load_manifest(manifest_path):
+    """Read a member -> CRC manifest, or None if it is missing or unreadable"""
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)['members']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def invalidate_index(zip_path=REPO_ZIP_PATH):
+    """Drop the sidecar index so the next lookup rebuilds it"""
+    index_path = index_path_for(zip_path)
+    _cache.pop(index_path, None)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+
+def load_index(zip_path=REPO_ZIP_PATH):
+    """Return the index for the current archive, rebuilding it if the archive changed"""
+    index_path = index_path_for(zip_path)
+    key = archive_key(zip_path)
+
+    index = _cache.get(index_path)
+    if index and index.get('archive') == key:
+        return index
+
+    if os.path.exists(index_path):
+        try:
+            with span("repo_index.load"), open(index_path) as f:
+                index = json.load(f)
+            if index.get('format') == INDEX_FORMAT and index.get('archive') == key:
+                _cache[index_path] = index
+                return index
+            logger.info("Repository index is stale")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Repository index unreadable: {e}")
+
+    return build_index(zip_path)
+
+def get_champion_entries(champion, skip_chromas=False, zip_path=REPO_ZIP_PATH):
+    """Look up the skin (and optionally chroma) members for a champion"""
+    group = load_index(zip_path)['champions'].get(champion)
+    if not group:
+        return []
+    if skip_chromas:
+        return list(group['skins'])
+    return group['skins'] + group['chromas']
+
+def get_entry(member_name, zip_path=REPO_ZIP_PATH):
+    """Look up a single skin or chroma member by its full name"""
+    member = classify_member(member_name)
+    if not member:
+        return None
+    champion, kind = member
+    group = load_index(zip_path)['champions'].get(champion)
+    if not group:
+        return None
+    return next((entry for entry in group[kind] if entry['name'] == member_name), None)
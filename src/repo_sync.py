@@ -0,0 +1,127 @@
+import os
+from config import REPO_ZIP_PATH, INSTALLED_DIR
+from logger import setup_logger
+from repo_index import (
+    load_index,
+    load_manifest,
+    manifest_path_for,
+    invalidate_index,
+    classify_member,
+    skin_folder_name,
+)
+from skin_downloader import download_repo
+from skin_installer import install_entries, load_installed_manifest, save_installed_manifest
+from trash import move_to_trash
+
+logger = setup_logger(__name__)
+
+def _is_installed(member_name, registered=()):
+    """Extracted, or registered to be extracted on demand"""
+    return member_name in registered or os.path.isdir(os.path.join(INSTALLED_DIR, skin_folder_name(member_name)))
+
+def _installed_kinds(old_members, registered=()):
+    """Which (champion, kind) groups the user has installed from the previous archive"""
+    kinds = set()
+    for name in old_members:
+        member = classify_member(name)
+        if member and _is_installed(name, registered):
+            kinds.add(member)
+    return kinds
+
+def diff_manifests(old_members, new_members):
+    """
+    Compare two member -> CRC manifests.
+    Returns:
+        dict: { 'added': [names], 'changed': [names], 'removed': [names] }
+    """
+    return {
+        'added': sorted(name for name in new_members if name not in old_members),
+        'changed': sorted(
+            name for name, crc in new_members.items()
+            if name in old_members and old_members[name] != crc
+        ),
+        'removed': sorted(name for name in old_members if name not in new_members),
+    }
+
+def sync_repo(jobs=None):
+    """
+    Replace the repository archive with the latest one and update INSTALLED_DIR
+    in place: only added, changed or removed skins are extracted or deleted.
+    The previous manifest is kept as a .prev file until the sync completes,
+    so an interrupted sync resumes against the same baseline.
+    Returns:
+        dict: { 'added': int, 'changed': int, 'removed': int }, or None when
+        there is no previous manifest to diff against
+    Raises:
+        IOError: the new archive could not be downloaded; the .prev manifest is
+        kept so the sync is retried
+    """
+    manifest_path = manifest_path_for(REPO_ZIP_PATH)
+    prev_path = f"{manifest_path}.prev"
+
+    if not os.path.exists(prev_path):
+        if not os.path.exists(manifest_path):
+            logger.info("No repository manifest to sync against")
+            return None
+        os.replace(manifest_path, prev_path)
+
+    old_members = load_manifest(prev_path)
+    if old_members is None:
+        logger.warning("Previous repository manifest unreadable")
+        os.remove(prev_path)
+        return None
+
+    registered = {record['member'] for record in load_installed_manifest().values() if record.get('on_demand')}
+    installed_kinds = _installed_kinds(old_members, registered)
+
+    if os.path.exists(REPO_ZIP_PATH):
+        invalidate_index(REPO_ZIP_PATH)
+        os.remove(REPO_ZIP_PATH)
+
+    if not installed_kinds:
+        logger.info("No installed skins to sync, new repository will be fetched on demand")
+        os.remove(prev_path)
+        return {'added': 0, 'changed': 0, 'removed': 0}
+
+    if not download_repo():
+        raise IOError("Repository download unsuccessful")
+
+    index = load_index()
+    entries = {
+        entry['name']: entry
+        for group in index['champions'].values()
+        for kind in ('skins', 'chromas')
+        for entry in group[kind]
+    }
+    new_members = {name: entry['crc'] for name, entry in entries.items()}
+    diff = diff_manifests(old_members, new_members)
+
+    removed = 0
+    manifest = load_installed_manifest()
+    for name in diff['removed']:
+        # Skins only registered on demand have no folder yet, dropping the entry is enough
+        manifest.pop(skin_folder_name(name), None)
+        skin_dir = os.path.join(INSTALLED_DIR, skin_folder_name(name))
+        if os.path.isdir(skin_dir):
+            move_to_trash(skin_dir)
+            logger.info(f"Removed skin: {skin_folder_name(name)}")
+            removed += 1
+    save_installed_manifest(manifest)
+
+    changed = [entries[name] for name in diff['changed'] if _is_installed(name, registered)]
+
+    added = [
+        entries[name] for name in diff['added']
+        if classify_member(name) in installed_kinds and not _is_installed(name, registered)
+    ]
+
+    # Also empties the trash, collecting the blobs of removed and replaced skins
+    install_entries(changed + added, jobs)
+    os.remove(prev_path)
+
+    summary = {'added': len(added), 'changed': len(changed), 'removed': removed}
+    logger.info(
+        f"Repository sync: {summary['added']} added, {summary['changed']} changed, "
+        f"{summary['removed']} removed ({len(diff['changed'])} changed upstream)"
+    )
+    return summary
@@ -1,21 +1,217 @@
 import os
-import requests
-from config import SKINS_REPO_URL, REPO_ZIP_PATH
+import json
+import time
+import zipfile
+import threading
+import http_client
+from concurrent.futures import ThreadPoolExecutor
+from config import SKINS_REPO_URL, REPO_ZIP_PATH, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_SEGMENTS
 from logger import setup_logger
+from instrumentation import record, span
+from repo_index import build_index, invalidate_index
 
 logger = setup_logger(__name__)
 
-def download_repo():
+STATE_SAVE_INTERVAL = 16 * 1024 * 1024
+
+def _validator(headers):
+    """Strong ETag, else Last-Modified: what If-Range accepts to identify a version of the file"""
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+def _probe(url):
+    """Return (size, accepts_ranges, validator) for a URL, or (None, False, None) if unknown"""
+    try:
+        response = http_client.head(url)
+        response.raise_for_status()
+        size = response.headers.get("Content-Length")
+        ranged = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return (int(size) if size else None), ranged, _validator(response.headers)
+    except Exception as e:
+        logger.warning(f"Download probe failed, falling back to a plain stream: {e}")
+        return None, False, None
+
+def _prepare_part(part_path, validator):
+    """
+    Keep a .part file only if it was downloaded from the same version of the
+    file, as recorded next to it; anything else starts over.
+    """
+    validator_path = f"{part_path}.validator"
+    try:
+        with open(validator_path) as f:
+            previous = f.read()
+    except OSError:
+        previous = None
+    if os.path.exists(part_path) and (not validator or previous != validator):
+        logger.info("Partial download is from another version of the file, restarting")
+        for path in (part_path, f"{part_path}.json"):
+            if os.path.exists(path):
+                os.remove(path)
+    if validator:
+        with open(validator_path, 'w') as f:
+            f.write(validator)
+    elif os.path.exists(validator_path):
+        os.remove(validator_path)
+
+def _range_headers(byte_range, validator):
+    headers = {"Range": f"bytes={byte_range}"}
+    if validator:
+        # The server answers 200 with the whole file if it changed since the validator
+        headers["If-Range"] = validator
+    return headers
+
+def _download_stream(url, part_path, validator=None):
+    """Stream url into part_path, resuming from its current size when the server allows it"""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = _range_headers(f"{offset}-", validator) if offset else {}
+
+    with http_client.get(url, headers=headers, stream=True) as response:
+        if response.status_code == 416:
+            logger.info("Partial download already complete")
+            return 0
+        response.raise_for_status()
+
+        if offset and response.status_code == 206:
+            logger.info(f"Resuming download at {offset} bytes")
+            mode = 'ab'
+        else:
+            if offset:
+                logger.info("Server ignored range request, restarting download")
+            mode = 'wb'
+
+        written = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                written += len(chunk)
+    return written
+
+def _load_segment_state(state_path, size, segments):
+    """Load per-segment progress of an interrupted segmented download"""
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get('size') == size and state.get('requested') == segments:
+            return state
+    except (OSError, ValueError):
+        pass
+    step = -(-size // segments)
+    ranges = [[start, min(start + step, size), start] for start in range(0, size, step)]
+    return {'size': size, 'requested': segments, 'segments': ranges}
+
+def _download_segmented(url, part_path, size, segments, validator=None):
+    """Fetch url as parallel HTTP range segments written in place into part_path"""
+    state_path = f"{part_path}.json"
+    if os.path.exists(part_path) and os.path.getsize(part_path) == size:
+        mode = 'r+b'
+    else:
+        mode = 'wb'
+        if os.path.exists(state_path):
+            os.remove(state_path)
+    with open(part_path, mode) as f:
+        f.truncate(size)
+
+    state = _load_segment_state(state_path, size, segments)
+    state_lock = threading.Lock()
+
+    def save_state():
+        with state_lock:
+            with open(state_path, 'w') as f:
+                json.dump(state, f)
+
+    def fetch(segment):
+        start, end, done = segment
+        if done >= end:
+            return 0
+        written = 0
+        unsaved = 0
+        headers = _range_headers(f"{done}-{end - 1}", validator)
+        with http_client.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError("Server does not honour range requests, or the file changed")
+            with open(part_path, 'r+b') as f:
+                f.seek(done)
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    segment[2] += len(chunk)
+                    written += len(chunk)
+                    unsaved += len(chunk)
+                    if unsaved >= STATE_SAVE_INTERVAL:
+                        f.flush()
+                        save_state()
+                        unsaved = 0
+        save_state()
+        if segment[2] < end:
+            raise IOError(f"Segment {start}-{end} ended early")
+        return written
+
+    save_state()
+    with ThreadPoolExecutor(max_workers=len(state['segments'])) as pool:
+        written = sum(pool.map(fetch, state['segments']))
+    os.remove(state_path)
+    return written
+
+def _verify_zip(path, expected_size=None):
+    """
+    Check the downloaded file has the expected size, a readable central directory
+    and members whose data matches their CRCs, so a resumed download spliced from
+    two versions or with unfilled segments is rejected.
+    """
+    if expected_size is not None and os.path.getsize(path) != expected_size:
+        raise IOError(f"Size mismatch: {os.path.getsize(path)} != {expected_size}")
+    with span("repo_download.verify"), zipfile.ZipFile(path) as archive:
+        if not archive.infolist():
+            raise zipfile.BadZipFile("Archive is empty")
+        bad = archive.testzip()
+        if bad:
+            raise zipfile.BadZipFile(f"CRC mismatch for {bad}")
+
+def download_file(url, dest, segments=1):
+    """
+    Download url to dest through a resumable .part file.
+    The file is only renamed into place once it is a complete, readable zip.
+    Returns:
+        dict: { 'bytes': int, 'seconds': float, 'rate': bytes per second }
+    """
+    part_path = f"{dest}.part"
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    size, ranged, validator = _probe(url)
+    _prepare_part(part_path, validator)
+    start = time.perf_counter()
+
+    if segments > 1 and ranged and size:
+        logger.info(f"Downloading {size} bytes in {segments} segments")
+        written = _download_segmented(url, part_path, size, segments, validator)
+    else:
+        written = _download_stream(url, part_path, validator)
+
+    try:
+        _verify_zip(part_path, size)
+    except Exception:
+        os.remove(part_path)
+        raise
+    os.replace(part_path, dest)
+    if os.path.exists(f"{part_path}.validator"):
+        os.remove(f"{part_path}.validator")
+
+    seconds = time.perf_counter() - start
+    record("repo_download", seconds, nbytes=written, files=1)
+    rate = written / seconds if seconds > 0 else 0.0
+    logger.info(f"Downloaded {written / 1048576:.1f} MB in {seconds:.1f}s ({rate / 1048576:.1f} MB/s)")
+    return {'bytes': written, 'seconds': seconds, 'rate': rate}
+
+def download_repo(url=SKINS_REPO_URL, dest=REPO_ZIP_PATH, segments=DOWNLOAD_SEGMENTS):
     """Download skins repository if missing"""
-    if not os.path.exists(REPO_ZIP_PATH):
+    if not os.path.exists(dest):
         logger.info("Downloading skins repository")
         try:
-            response = requests.get(SKINS_REPO_URL, stream=True, timeout=30)
-            response.raise_for_status()
-            with open(REPO_ZIP_PATH, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            invalidate_index(dest)
+            download_file(url, dest, segments)
             logger.info("Repository download complete")
+            build_index(dest)
             return True
         except Exception as e:
             logger.error(f"Repository download failed: {e}")
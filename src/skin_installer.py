@@ -1,43 +1,680 @@
 import os
 import io
+import json
+import time
+import uuid
+import shutil
+import struct
 import zipfile
-from config import INSTALL_DIR, DOWNLOAD_DIR, REPO_ZIP_PATH, INSTALLED_DIR
-from logger import setup_logger
+import tempfile
+import threading
+from itertools import islice
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    INSTALL_DIR,
+    DOWNLOAD_DIR,
+    REPO_ZIP_PATH,
+    INSTALLED_DIR,
+    INSTALLED_MANIFEST_FILE,
+    STAGING_DIR,
+    BATCH_JOURNAL_FILE,
+    BATCH_CHECKPOINT_INTERVAL,
+    INSTALLED_MAX_BYTES,
+    INSTALLED_MAX_SKINS,
+    DEFAULT_JOBS,
+    INNER_ZIP_SPOOL_THRESHOLD,
+    COPY_BUFFER_SIZE,
+    LAZY_CHROMAS,
+)
+import blob_store
+from logger import setup_logger, LineBatcher
+from instrumentation import span
+from repo_index import get_champion_entries, get_entry, load_index, skin_folder_name, classify_member, source_zip_for
+from trash import move_to_trash, empty_trash, empty_trash_in_background, is_trash_empty
 
 logger = setup_logger(__name__)
 
-def install_skins(champion, skip_chromas=False):
-    """Install skins directly from repository zip to CSLOL Manager"""
-    installed = 0
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+INSTALLED = "installed"
+SKIPPED = "skipped"
+REPAIRED = "repaired"
+REGISTERED = "registered"
+FAILED = "failed"
+
+class MemberView(io.RawIOBase):
+    """Read-only seekable window over a byte range of an open file"""
+
+    def __init__(self, fileobj, start, size):
+        self._file = fileobj
+        self._start = start
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer):
+        remaining = self._size - self._pos
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:remaining]
+        self._file.seek(self._start + self._pos)
+        read = self._file.readinto(view)
+        self._pos += read
+        return read
+
+def _member_data_offset(fileobj, entry):
+    """Locate the first data byte of a member by reading its local file header"""
+    fileobj.seek(entry['offset'])
+    header = fileobj.read(LOCAL_HEADER.size)
+    fields = LOCAL_HEADER.unpack(header)
+    if fields[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {entry['name']}")
+    return entry['offset'] + LOCAL_HEADER.size + fields[9] + fields[10]
+
+@contextmanager
+def _open_skin_archive(repo_zip, entry):
+    """
+    Open an inner skin zip without materializing it in memory.
+    Stored members are read in place through a MemberView of the repository file;
+    compressed members are inflated into a spooled file that moves to disk above
+    INNER_ZIP_SPOOL_THRESHOLD.
+    """
+    if entry['compress_type'] == zipfile.ZIP_STORED:
+        with open(repo_zip.filename, 'rb', buffering=0) as raw:
+            view = MemberView(raw, _member_data_offset(raw, entry), entry['file_size'])
+            with zipfile.ZipFile(io.BufferedReader(view, COPY_BUFFER_SIZE)) as skin_archive:
+                yield skin_archive
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=INNER_ZIP_SPOOL_THRESHOLD) as spool:
+        with repo_zip.open(entry['name']) as skin_zip:
+            shutil.copyfileobj(skin_zip, spool, COPY_BUFFER_SIZE)
+        spool.seek(0)
+        with zipfile.ZipFile(spool) as skin_archive:
+            yield skin_archive
+
+def load_installed_manifest():
+    """Load the record of installed skins, keyed by skin folder name"""
+    try:
+        with open(INSTALLED_MANIFEST_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Installed skin manifest unreadable, rebuilding: {e}")
+        return {}
+
+def save_installed_manifest(manifest):
+    """Atomically write the record of installed skins"""
+    os.makedirs(INSTALLED_DIR, exist_ok=True)
+    tmp_path = f"{INSTALLED_MANIFEST_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, INSTALLED_MANIFEST_FILE)
+
+def _member_path(install_path, name):
+    """Where an inner archive member lands, with unsafe path components dropped"""
+    parts = [part for part in name.split("/") if part not in ("", ".", "..")]
+    return os.path.join(install_path, *parts)
+
+def _file_state(install_path, names):
+    """Size and mtime of extracted files, as stored in the installed manifest"""
+    files = {}
+    for name in names:
+        stat = os.stat(_member_path(install_path, name))
+        files[name] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+def _extract_files(skin_archive, names, install_path, verify=False):
+    """Extract members directly, or link them from the blob store when it is enabled"""
+    if not blob_store.is_enabled():
+        for name in names:
+            skin_archive.extract(name, install_path)
+        return
+    for name in names:
+        blob_store.materialize(skin_archive, skin_archive.getinfo(name), _member_path(install_path, name), verify)
+
+def _damaged_files(install_path, files):
+    """Files of an installed skin that are missing or differ from the manifest"""
+    damaged = []
+    for name, (size, mtime_ns) in files.items():
+        try:
+            stat = os.stat(_member_path(install_path, name))
+        except OSError:
+            damaged.append(name)
+            continue
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            damaged.append(name)
+    return damaged
+
+def _staging_path(skin_name):
+    path = os.path.join(STAGING_DIR, f"{skin_name}.{uuid.uuid4().hex[:8]}")
+    os.makedirs(path)
+    return path
+
+def _commit_staged(staging_path, install_path):
+    """Swap a fully extracted skin into place; the previous version goes to the trash"""
+    if os.path.lexists(install_path):
+        move_to_trash(install_path)
+    os.makedirs(INSTALLED_DIR, exist_ok=True)
+    os.rename(staging_path, install_path)
+
+def _clear_staging():
+    """Throw away skins left half-extracted by an interrupted run"""
+    if os.path.isdir(STAGING_DIR) and os.listdir(STAGING_DIR):
+        logger.info("Discarding partially extracted skins from an interrupted install")
+        move_to_trash(STAGING_DIR)
+
+def _is_chroma(entry):
+    member = classify_member(entry['name'])
+    return bool(member) and member[1] == "chromas"
+
+def _install_entry(repo_zip, entry, record=None, register_only=False):
+    """
+    Bring one skin folder in INSTALLED_DIR in line with its repository member.
+    Unchanged skins are only stat'ed; skins whose member is unchanged but whose
+    files were deleted or modified get just those files re-extracted.
+    With register_only, a skin that is not already extracted on demand is only
+    recorded in the manifest, to be extracted by materialize_skins later.
+    Returns:
+        tuple: (skin_name, status, manifest record)
+    """
+    skin_name = skin_folder_name(entry['name'])
+    install_path = os.path.join(INSTALLED_DIR, skin_name)
+    on_demand = register_only if record is None else bool(record.get('on_demand'))
+
+    if register_only and on_demand and not (record and record['files']):
+        return skin_name, REGISTERED, {'member': entry['name'], 'crc': entry['crc'], 'files': {}, 'on_demand': True}
+
+    if record and record['files'] and record['member'] == entry['name'] and record['crc'] == entry['crc']:
+        with span("verify_skin") as stage:
+            damaged = _damaged_files(install_path, record['files'])
+            stage['files'] += len(record['files'])
+        if not damaged:
+            return skin_name, SKIPPED, record
+
+        with span("repair_skin") as stage, _open_skin_archive(repo_zip, entry) as skin_archive:
+            _extract_files(skin_archive, damaged, install_path, verify=True)
+            files = dict(record['files'])
+            files.update(_file_state(install_path, damaged))
+            stage['files'] += len(damaged)
+            stage['bytes'] += sum(files[name][0] for name in damaged)
+        return skin_name, REPAIRED, dict(record, files=files)
+
+    with span("extract_skin") as stage:
+        # Extract next to INSTALLED_DIR and rename into place, so CSLOL never sees a half-written skin
+        staging_path = _staging_path(skin_name)
+        try:
+            with _open_skin_archive(repo_zip, entry) as skin_archive:
+                names = [info.filename for info in skin_archive.infolist() if not info.is_dir()]
+                _extract_files(skin_archive, names, staging_path)
+            files = _file_state(staging_path, names)
+        except BaseException:
+            move_to_trash(staging_path)
+            raise
+        _commit_staged(staging_path, install_path)
+        stage['files'] += len(files)
+        stage['bytes'] += sum(size for size, _ in files.values())
+
+    record = {'member': entry['name'], 'crc': entry['crc'], 'files': files, 'used_at': time.time()}
+    if on_demand:
+        record['on_demand'] = True
+    return skin_name, INSTALLED, record
+
+# Parsed repository zips kept open between installs when running resident:
+# zip path -> {'key': (size, mtime_ns) of the file they were opened on, 'handles': [ZipFile]}
+_warm_zips = None
+_warm_lock = threading.Lock()
+
+def keep_zip_handles(enabled=True, preload=()):
+    """
+    Keep parsed zip handles open between installs instead of reopening them
+    (daemon mode), optionally parsing the given archives right away.
+    """
+    global _warm_zips
+    with _warm_lock:
+        pools = _warm_zips or {}
+        _warm_zips = pools if enabled else None
+    if not enabled:
+        for pool in pools.values():
+            for repo_zip in pool['handles']:
+                repo_zip.close()
+        return
+    for zip_path in preload:
+        if os.path.exists(zip_path):
+            _release_zip(zip_path, *_acquire_zip(zip_path))
+
+def _zip_key(zip_path):
+    stat = os.stat(zip_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def _acquire_zip(zip_path):
+    """A parsed handle on zip_path, from the warm pool when it still matches the file"""
+    key = _zip_key(zip_path)
+    with _warm_lock:
+        pool = _warm_zips.get(zip_path) if _warm_zips is not None else None
+        if pool and pool['key'] == key and pool['handles']:
+            return pool['handles'].pop(), key
+    with span("repo_zip.open"):
+        return zipfile.ZipFile(zip_path), key
+
+def _release_zip(zip_path, repo_zip, key):
+    """Return a handle to the warm pool, or close it when pooling is off or the file changed"""
+    to_close = [repo_zip]
+    with _warm_lock:
+        try:
+            current = _zip_key(zip_path)
+        except OSError:
+            current = None
+        if _warm_zips is not None and current == key:
+            pool = _warm_zips.get(zip_path)
+            if pool is None or pool['key'] != key:
+                to_close = pool['handles'] if pool else []
+                pool = _warm_zips[zip_path] = {'key': key, 'handles': []}
+            else:
+                to_close = []
+            pool['handles'].append(repo_zip)
+    for handle in to_close:
+        handle.close()
+
+def _extract_entries(entries, manifest, jobs=None, lazy_chromas=False, zip_path=REPO_ZIP_PATH, materialize=False):
+    """
+    Extract entries on a bounded thread pool, one repository zip handle per worker.
+    Yields (entry, outcome, error) in the order of entries, so callers log and
+    count deterministically regardless of which worker finished first.
+    With lazy_chromas, chroma entries are only registered; on-demand skins that
+    are not extracted stay registered unless materialize is set.
+    """
+    jobs = max(1, jobs or DEFAULT_JOBS)
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def worker(entry, record):
+        repo_zip = getattr(local, 'repo_zip', None)
+        if repo_zip is None:
+            repo_zip, key = _acquire_zip(zip_path)
+            local.repo_zip = repo_zip
+            with handles_lock:
+                handles.append((repo_zip, key))
+        register_only = not materialize and (
+            (lazy_chromas and _is_chroma(entry)) or bool(record and record.get('on_demand'))
+        )
+        return _install_entry(repo_zip, entry, record, register_only)
+
+    # Only a window of entries is queued at a time, so a consumer that stops
+    # early waits for the extractions in flight rather than the whole batch
+    pool = ThreadPoolExecutor(max_workers=min(jobs, len(entries) or 1))
+    remaining = iter(entries)
+    pending = deque()
+
+    def submit(count):
+        for entry in islice(remaining, count):
+            pending.append((entry, pool.submit(worker, entry, manifest.get(skin_folder_name(entry['name'])))))
+
     try:
-        with zipfile.ZipFile(REPO_ZIP_PATH) as repo_zip:
-            skin_files = [
-                f for f in repo_zip.namelist()
-                if f.startswith(f"lol-skins-main/skins/{champion}/")
-                and f.endswith(".zip")
-            ]
+        submit(jobs * 2)
+        while pending:
+            entry, future = pending.popleft()
+            submit(1)
+            try:
+                yield entry, future.result(), None
+            except Exception as e:
+                yield entry, None, e
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for repo_zip, key in handles:
+            _release_zip(zip_path, repo_zip, key)
 
-            if skip_chromas:
-                skin_files = [f for f in skin_files if 'chromas' not in f]
+def _empty_trash():
+    """
+    Delete replaced and evicted skins. With dedup this happens right away, so the
+    blobs only those skins linked to can be garbage collected.
+    """
+    if blob_store.is_enabled() and not is_trash_empty():
+        empty_trash()
+        blob_store.collect_garbage()
+    else:
+        empty_trash_in_background()
 
-            if not skin_files:
-                logger.warning(f"No skins found for {champion}")
-                return 0
+def _new_counts():
+    return {INSTALLED: 0, SKIPPED: 0, REPAIRED: 0, REGISTERED: 0, FAILED: 0}
 
-            for skin_path in skin_files:
-                skin_name = os.path.splitext(os.path.basename(skin_path))[0]
-                install_path = os.path.join(INSTALLED_DIR, skin_name)
+def _outcome_logs():
+    return {INSTALLED: LineBatcher(logger, "Installed skins"), REPAIRED: LineBatcher(logger, "Repaired skins")}
 
-                os.makedirs(install_path, exist_ok=True)
+def _flush_logs(logs):
+    for batch in logs.values():
+        batch.flush()
 
-                with repo_zip.open(skin_path) as skin_zip:
-                    with zipfile.ZipFile(io.BytesIO(skin_zip.read())) as skin_archive:
-                        skin_archive.extractall(install_path)
+def _record_outcome(manifest, counts, logs, entry, outcome, error):
+    """Log one extraction result and fold it into the manifest and counters"""
+    if error:
+        logger.error(f"Skin installation failed for {entry['name']}: {error}")
+        counts[FAILED] += 1
+        return
+    skin_name, status, record = outcome
+    manifest[skin_name] = record
+    counts[status] += 1
+    if status in logs:
+        logs[status].add(skin_name)
 
-                installed += 1
-                logger.info(f"Installed skin: {skin_name}")
+def install_entries(entries, jobs=None, lazy_chromas=LAZY_CHROMAS, zip_path=REPO_ZIP_PATH, materialize=False):
+    """
+    Install the given index entries from zip_path.
+    Returns:
+        dict: { 'installed': int, 'skipped': int, 'repaired': int, 'registered': int, 'failed': int }
+    """
+    counts = _new_counts()
+    logs = _outcome_logs()
+    manifest = load_installed_manifest()
+    _clear_staging()
+    try:
+        for entry, outcome, error in _extract_entries(entries, manifest, jobs, lazy_chromas, zip_path, materialize):
+            _record_outcome(manifest, counts, logs, entry, outcome, error)
+    finally:
+        _flush_logs(logs)
+        save_installed_manifest(manifest)
+        blob_store.save_catalog()
+        _empty_trash()
+    return counts
+
+def install_skins(champion, skip_chromas=False, jobs=None, lazy_chromas=LAZY_CHROMAS, zip_path=REPO_ZIP_PATH):
+    """
+    Install skins directly from repository zip (or a sparse per-champion zip) to CSLOL Manager
+    Returns:
+        dict: { 'installed': int, 'skipped': int, 'repaired': int, 'registered': int, 'failed': int }
+    """
+    counts = _new_counts()
+    skin_entries = []
+    try:
+        skin_entries = get_champion_entries(champion, skip_chromas, zip_path)
+
+        if not skin_entries:
+            logger.warning(f"No skins found for {champion}")
+            return counts
+
+        counts = install_entries(skin_entries, jobs, lazy_chromas, zip_path)
 
     except Exception as e:
         logger.error(f"Skin installation failed: {e}")
+        counts[FAILED] = max(1, len(skin_entries))
+
+    return counts
+
+def load_batch_journal():
+    """The journal of an interrupted batch install, or None"""
+    try:
+        with open(BATCH_JOURNAL_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_batch_journal(journal):
+    tmp_path = f"{BATCH_JOURNAL_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(journal, f)
+    os.replace(tmp_path, BATCH_JOURNAL_FILE)
+
+def clear_batch_journal():
+    if os.path.exists(BATCH_JOURNAL_FILE):
+        os.remove(BATCH_JOURNAL_FILE)
+
+def install_all_skins(champions, skip_chromas=False, progress=None, jobs=None, lazy_chromas=LAZY_CHROMAS,
+                      resume=False):
+    """
+    Install skins for many champions with a single pass over the repository zip.
+    Finished champions are checkpointed to BATCH_JOURNAL_FILE together with the
+    installed manifest, so a run that is stopped at any point can be resumed.
+    Champions with failed skins are retried by a resumed run, but do not keep
+    the journal around once every champion has been attempted.
+    Args:
+        champions: champion names, processed in order
+        skip_chromas: leave chroma members out
+        progress: optional callback(position, total, champion, counts)
+        jobs: extraction worker count, defaults to DEFAULT_JOBS
+        lazy_chromas: register chromas instead of extracting them
+        resume: skip champions a matching interrupted run already finished
+    Returns:
+        dict: { champion: { 'installed': int, 'skipped': int, 'repaired': int, 'registered': int, 'failed': int } }
+    """
+    results = {champion: _new_counts() for champion in champions}
+    logs = _outcome_logs()
+    manifest = load_installed_manifest()
+    journal = None
+    _clear_staging()
+    try:
+        index = load_index()
+        groups = index['champions']
+
+        journal = {
+            'champions': list(champions),
+            'skip_chromas': skip_chromas,
+            'lazy_chromas': lazy_chromas,
+            'archive': index['archive'],
+            'done': [],
+            'failed': [],
+        }
+        previous = load_batch_journal() if resume else None
+        if previous and all(previous.get(key) == journal[key] for key in ('champions', 'skip_chromas', 'lazy_chromas', 'archive')):
+            journal['done'] = previous['done']
+            logger.info(f"Resuming batch install after {len(journal['done'])} finished champions")
+        done = set(journal['done'])
+        positions = {champion: position for position, champion in enumerate(champions, 1)}
+
+        plan = []
+        for champion in champions:
+            group = groups.get(champion)
+            if champion in done:
+                continue
+            if not group:
+                plan.append((champion, []))
+            elif skip_chromas:
+                plan.append((champion, group['skins']))
+            else:
+                plan.append((champion, group['skins'] + group['chromas']))
+
+        extracted = _extract_entries(
+            [entry for _, entries in plan for entry in entries], manifest, jobs, lazy_chromas
+        )
+        checkpointed = time.monotonic()
+        try:
+            for champion, entries in plan:
+                if not entries:
+                    logger.warning(f"No skins found for {champion}")
+
+                counts = results[champion]
+                failed = False
+                for _ in entries:
+                    entry, outcome, error = next(extracted)
+                    _record_outcome(manifest, counts, logs, entry, outcome, error)
+                    failed = failed or error is not None
+                _flush_logs(logs)
+                journal['failed' if failed else 'done'].append(champion)
+
+                logger.info(
+                    f"{champion}: {counts[INSTALLED]} installed, {counts[SKIPPED]} skipped, "
+                    f"{counts[REPAIRED]} repaired"
+                )
+                if progress:
+                    progress(positions[champion], len(champions), champion, counts)
+
+                if time.monotonic() - checkpointed >= BATCH_CHECKPOINT_INTERVAL:
+                    # Manifest first: a journal entry must never refer to unrecorded skins
+                    save_installed_manifest(manifest)
+                    _save_batch_journal(journal)
+                    checkpointed = time.monotonic()
+        finally:
+            extracted.close()
+
+    except Exception as e:
+        logger.error(f"Batch installation failed: {e}")
+    finally:
+        _flush_logs(logs)
+        save_installed_manifest(manifest)
+        blob_store.save_catalog()
+        if journal is not None:
+            if len(journal['done']) + len(journal['failed']) == len(champions):
+                clear_batch_journal()
+            else:
+                _save_batch_journal(journal)
+        _empty_trash()
+
+    return results
+
+def get_on_demand_skins(manifest=None):
+    """Registered on-demand skins, mapped to whether they are currently extracted"""
+    manifest = manifest if manifest is not None else load_installed_manifest()
+    return {skin: bool(record['files']) for skin, record in manifest.items() if record.get('on_demand')}
+
+def materialize_skins(skin_names, jobs=None):
+    """
+    Extract registered on-demand skins from the indexed repository zip, or from
+    the champion's sparse zip when the full archive is not downloaded.
+    Returns:
+        int: number of skins extracted
+    """
+    manifest = load_installed_manifest()
+    by_source = {}
+    for skin in skin_names:
+        record = manifest.get(skin)
+        zip_path = source_zip_for(record['member']) if record else None
+        entry = get_entry(record['member'], zip_path) if zip_path else None
+        if entry:
+            by_source.setdefault(zip_path, []).append(entry)
+        else:
+            logger.warning(f"{skin} is not in the repository, cannot extract it")
+
+    extracted = 0
+    with span("materialize_skins"):
+        for zip_path, entries in by_source.items():
+            counts = install_entries(entries, jobs, lazy_chromas=False, zip_path=zip_path, materialize=True)
+            extracted += counts[INSTALLED] + counts[REPAIRED]
+    return extracted
+
+def evict_skins(skin_names):
+    """
+    Delete the extracted files of skins, keeping them registered so they are
+    extracted again from the repository zip once enabled.
+    """
+    manifest = load_installed_manifest()
+    evicted = 0
+    for skin in skin_names:
+        record = manifest.get(skin)
+        if not record or not record['files']:
+            continue
+        move_to_trash(os.path.join(INSTALLED_DIR, skin))
+        manifest[skin] = dict(record, files={}, on_demand=True)
+        evicted += 1
+    if evicted:
+        save_installed_manifest(manifest)
+        _empty_trash()
+        logger.info(f"Evicted {evicted} skins")
+    return evicted
+
+def touch_skins(skin_names):
+    """Mark skins as just used, for the least-recently-used eviction order"""
+    manifest = load_installed_manifest()
+    now = time.time()
+    touched = False
+    for skin in skin_names:
+        if skin in manifest:
+            manifest[skin]['used_at'] = now
+            touched = True
+    if touched:
+        save_installed_manifest(manifest)
+
+def installed_usage(manifest=None):
+    """
+    Size of the extracted skins, from the manifest rather than a disk walk.
+    Returns:
+        dict: { 'skins': int, 'bytes': int }
+    """
+    manifest = manifest if manifest is not None else load_installed_manifest()
+    extracted = [record for record in manifest.values() if record['files']]
+    return {
+        'skins': len(extracted),
+        'bytes': sum(size for record in extracted for size, _ in record['files'].values()),
+    }
+
+def enforce_budget(enabled_mods, max_bytes=INSTALLED_MAX_BYTES, max_skins=INSTALLED_MAX_SKINS, keep_since=None):
+    """
+    Evict the least recently used extracted skins that are not enabled until
+    INSTALLED_DIR is back within the size and count budget. Skins extracted or
+    used at or after keep_since (a time.time() value) are kept, so an install
+    never evicts what it just extracted.
+    Returns:
+        int: number of skins evicted
+    """
+    manifest = load_installed_manifest()
+    usage = installed_usage(manifest)
+
+    def over_budget():
+        return ((max_bytes is not None and usage['bytes'] > max_bytes)
+                or (max_skins is not None and usage['skins'] > max_skins))
+
+    if not over_budget():
+        return 0
+
+    enabled = set(enabled_mods)
+    candidates = sorted(
+        (record.get('used_at', 0), skin) for skin, record in manifest.items()
+        if record['files'] and skin not in enabled
+        and (keep_since is None or record.get('used_at', 0) < keep_since)
+    )
+    to_evict = []
+    for _, skin in candidates:
+        if not over_budget():
+            break
+        to_evict.append(skin)
+        usage['bytes'] -= sum(size for size, _ in manifest[skin]['files'].values())
+        usage['skins'] -= 1
+
+    if over_budget():
+        logger.warning("Enabled skins alone exceed the installed-skin budget")
+    return evict_skins(to_evict)
 
-    return installed
+def apply_on_demand(enabled_mods, jobs=None):
+    """
+    Extract enabled on-demand skins that are not on disk yet, evict the
+    extracted ones that are no longer enabled, mark the enabled skins as used
+    and bring INSTALLED_DIR back within its budget.
+    Returns:
+        dict: { 'materialized': int, 'evicted': int, 'budget_evicted': int }
+    """
+    enabled = set(enabled_mods)
+    on_demand = get_on_demand_skins()
+    to_extract = [skin for skin in enabled_mods if skin in on_demand and not on_demand[skin]]
+    to_evict = [skin for skin, extracted in on_demand.items() if extracted and skin not in enabled]
+    result = {
+        'materialized': materialize_skins(to_extract, jobs) if to_extract else 0,
+        'evicted': evict_skins(to_evict) if to_evict else 0,
+    }
+    touch_skins(enabled_mods)
+    result['budget_evicted'] = enforce_budget(enabled_mods)
+    return result
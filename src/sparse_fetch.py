@@ -0,0 +1,222 @@
+import os
+import json
+import hashlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from config import (
+    SKINS_TREE_URL,
+    SKINS_RAW_URL,
+    SPARSE_CACHE_DIR,
+    SPARSE_FETCH,
+    SPARSE_FETCH_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    REPO_ZIP_PATH,
+)
+from logger import setup_logger
+from instrumentation import span
+from http_cache import get_json
+from repo_index import SKINS_PREFIX, sparse_zip_path, invalidate_index, build_index
+from champions import normalize_name, find_champion, resolve_repo_folder
+from skin_downloader import download_repo
+
+logger = setup_logger(__name__)
+
+FILES_DIR = os.path.join(SPARSE_CACHE_DIR, "files")
+FILES_INDEX = os.path.join(SPARSE_CACHE_DIR, "files.json")
+TREE_PREFIX = "skins/"
+
+def _load_files_index():
+    """path -> git blob sha of every file in the per-file cache"""
+    try:
+        with open(FILES_INDEX) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_files_index(files):
+    os.makedirs(SPARSE_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{FILES_INDEX}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(files, f)
+    os.replace(tmp_path, FILES_INDEX)
+
+def _cache_path(path):
+    return os.path.join(FILES_DIR, *path.split("/"))
+
+def _resolve_folder(champion, folders):
+    """Match a champion name, display name or id against the folders in the tree"""
+    by_name = {normalize_name(folder): folder for folder in folders}
+    candidates = [champion]
+    try:
+        champ = find_champion(champion)
+        if champ:
+            candidates += [champ['name'], champ['id']]
+    except Exception as e:
+        logger.warning(f"Champion catalog unavailable: {e}")
+    for candidate in candidates:
+        folder = by_name.get(normalize_name(candidate))
+        if folder:
+            return folder
+    return None
+
+def list_champion_files(champion, skip_chromas=False, tree_url=SKINS_TREE_URL):
+    """
+    Use the repository tree listing to find a champion's skin zips.
+    Returns:
+        tuple: (folder, [{'path', 'sha', 'size'}]), or None when the listing is
+        unavailable, truncated or has no such champion
+    """
+    with span("sparse.tree"):
+        tree = get_json(tree_url)
+    if tree.get('truncated'):
+        logger.warning("Repository tree listing is truncated")
+        return None
+
+    blobs = [
+        item for item in tree.get('tree', [])
+        if item.get('type') == "blob" and item['path'].startswith(TREE_PREFIX) and item['path'].endswith(".zip")
+    ]
+    folders = {item['path'].split("/")[1] for item in blobs}
+    folder = _resolve_folder(champion, folders)
+    if not folder:
+        logger.warning(f"{champion} not found in the repository tree")
+        return None
+
+    prefix = f"{TREE_PREFIX}{folder}/"
+    files = [
+        {'path': item['path'], 'sha': item['sha'], 'size': item.get('size')}
+        for item in blobs
+        if item['path'].startswith(prefix) and not (skip_chromas and item['path'].startswith(f"{prefix}chromas/"))
+    ]
+    return folder, sorted(files, key=lambda item: item['path'])
+
+def _git_blob_sha(path):
+    """SHA-1 of a file as git hashes it, to check downloads against the tree"""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _fetch_file(item, raw_url):
+    """Download one tree file into the per-file cache, returning its byte count"""
+    dest = _cache_path(item['path'])
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    part_path = f"{dest}.part"
+    with http_client.get(raw_url.format(path=item['path']), stream=True) as response:
+        response.raise_for_status()
+        with open(part_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    if _git_blob_sha(part_path) != item['sha']:
+        os.remove(part_path)
+        raise ValueError(f"Checksum mismatch for {item['path']}")
+    os.replace(part_path, dest)
+    return os.path.getsize(dest)
+
+def _archive_contents(zip_path):
+    """path -> sha of the files a per-champion archive was packed from"""
+    try:
+        with open(f"{zip_path}.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _build_archive(folder, files):
+    """
+    Pack cached files into a stored zip laid out like the repository archive, so
+    the index and installer read it exactly like lol-skins-main.zip.
+    """
+    zip_path = sparse_zip_path(folder)
+    tmp_path = f"{zip_path}.tmp"
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as archive:
+        for item in files:
+            archive.write(_cache_path(item['path']), SKINS_PREFIX + item['path'][len(TREE_PREFIX):])
+    invalidate_index(zip_path)
+    os.replace(tmp_path, zip_path)
+    contents_path = f"{zip_path}.json"
+    with open(f"{contents_path}.tmp", 'w') as f:
+        json.dump({item['path']: item['sha'] for item in files}, f)
+    os.replace(f"{contents_path}.tmp", contents_path)
+    build_index(zip_path)
+    return zip_path
+
+def fetch_champion(champion, skip_chromas=False, jobs=None, tree_url=SKINS_TREE_URL, raw_url=SKINS_RAW_URL):
+    """
+    Fetch only one champion's skin zips, reusing cached files whose git sha is
+    unchanged, and assemble them into a per-champion archive.
+    Returns:
+        tuple: (repository folder, archive path), or None to fall back to the
+        full repository download
+    """
+    try:
+        listing = list_champion_files(champion, skip_chromas, tree_url=tree_url)
+        if not listing:
+            return None
+        folder, wanted = listing
+        if not wanted:
+            logger.warning(f"No skins listed for {folder}")
+            return None
+
+        cached = _load_files_index()
+
+        def is_cached(item):
+            return cached.get(item['path']) == item['sha'] and os.path.exists(_cache_path(item['path']))
+
+        missing = [item for item in wanted if not is_cached(item)]
+        zip_path = sparse_zip_path(folder)
+
+        if missing:
+            logger.info(f"Fetching {len(missing)} of {len(wanted)} files for {folder}")
+            workers = max(1, min(jobs or SPARSE_FETCH_WORKERS, len(missing)))
+            with span("sparse.fetch") as stage, ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [(item, pool.submit(_fetch_file, item, raw_url)) for item in missing]
+                failed = 0
+                for item, future in futures:
+                    try:
+                        stage['bytes'] += future.result()
+                        stage['files'] += 1
+                        cached[item['path']] = item['sha']
+                    except Exception as e:
+                        logger.error(f"Fetching {item['path']} failed: {e}")
+                        failed += 1
+            _save_files_index(cached)
+            if failed:
+                return None
+
+        # Pack everything cached for the champion, so chromas fetched earlier stay available
+        pack = [item for item in wanted if is_cached(item)]
+        if skip_chromas:
+            chromas_prefix = f"{TREE_PREFIX}{folder}/chromas/"
+            pack += [
+                {'path': path, 'sha': sha} for path, sha in cached.items()
+                if path.startswith(chromas_prefix) and os.path.exists(_cache_path(path))
+            ]
+            pack.sort(key=lambda item: item['path'])
+        if not os.path.exists(zip_path) or _archive_contents(zip_path) != {item['path']: item['sha'] for item in pack}:
+            with span("sparse.pack"):
+                _build_archive(folder, pack)
+        return folder, zip_path
+    except Exception as e:
+        logger.error(f"Sparse fetch for {champion} failed: {e}")
+        return None
+
+def champion_source(champion, skip_chromas=False, jobs=None):
+    """
+    Pick the archive to install a champion from: the full repository zip when it
+    is on disk, else a sparse per-champion zip, else a fresh full download.
+    Returns:
+        tuple: (repository folder, archive path), or None if nothing could be fetched
+    """
+    if SPARSE_FETCH and not os.path.exists(REPO_ZIP_PATH):
+        # First install of a single champion: fetch its files instead of the whole repository
+        sparse = fetch_champion(champion, skip_chromas, jobs)
+        if sparse:
+            return sparse
+        logger.info("Sparse fetch unavailable, downloading the full repository")
+
+    if not download_repo():
+        logger.error("Failed to download skins repository")
+        return None
+    return resolve_repo_folder(champion), REPO_ZIP_PATH
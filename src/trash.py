@@ -0,0 +1,116 @@
+import os
+import stat
+import time
+import threading
+from config import TRASH_DIR
+from logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PROGRESS_EVERY = 1000
+
+_empty_lock = threading.Lock()
+_progress = {'running': False, 'entries': 0, 'files': 0, 'bytes': 0}
+
+def move_to_trash(path):
+    """
+    Rename path into TRASH_DIR so it disappears at once; the files are deleted
+    later by empty_trash. Falls back to deleting in place when the rename is not
+    possible (another volume, or a file held open on Windows).
+    Returns the trash path, or None if path was deleted in place or did not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    os.makedirs(TRASH_DIR, exist_ok=True)
+    target = os.path.join(TRASH_DIR, f"{os.path.basename(path)}-{time.time_ns()}")
+    try:
+        os.rename(path, target)
+        logger.info(f"Moved {path} to trash")
+        return target
+    except OSError as e:
+        logger.warning(f"Could not move {path} to trash, deleting in place: {e}")
+        _delete_tree(path)
+        return None
+
+def reset_dir(path):
+    """Swap path for an empty directory, trashing the old contents"""
+    move_to_trash(path)
+    os.makedirs(path, exist_ok=True)
+
+def _remove(func, path):
+    try:
+        func(path)
+    except OSError:
+        # Read-only files (common in extracted mods on Windows) refuse deletion until chmod
+        try:
+            os.chmod(path, stat.S_IWRITE)
+            func(path)
+        except OSError as e:
+            logger.warning(f"Could not delete {path}: {e}")
+
+def _delete_tree(path, progress=None):
+    """Delete bottom-up, counting files as they go"""
+    if os.path.islink(path) or not os.path.isdir(path):
+        _remove(os.remove, path)
+        return
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                size = os.lstat(file_path).st_size
+            except OSError:
+                size = 0
+            _remove(os.remove, file_path)
+            if progress is not None:
+                progress['files'] += 1
+                progress['bytes'] += size
+                if progress['files'] % PROGRESS_EVERY == 0:
+                    logger.info(f"Emptying trash: {progress['files']} files removed")
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            _remove(os.remove if os.path.islink(dir_path) else os.rmdir, dir_path)
+    _remove(os.rmdir, path)
+
+def empty_trash():
+    """
+    Delete everything in TRASH_DIR. Entries left behind by a crash or an early
+    exit are simply picked up by the next call.
+    Returns:
+        dict: {entries, files, bytes} removed by this call
+    """
+    if not _empty_lock.acquire(blocking=False):
+        return None
+    try:
+        _progress.update(running=True, entries=0, files=0, bytes=0)
+        try:
+            entries = os.listdir(TRASH_DIR)
+        except FileNotFoundError:
+            entries = []
+        start = time.perf_counter()
+        for name in entries:
+            _delete_tree(os.path.join(TRASH_DIR, name), _progress)
+            _progress['entries'] += 1
+        if entries:
+            logger.info(
+                f"Emptied trash: {_progress['entries']} entries, {_progress['files']} files, "
+                f"{_progress['bytes'] / 1048576:.1f} MB in {time.perf_counter() - start:.1f}s"
+            )
+        return {key: _progress[key] for key in ('entries', 'files', 'bytes')}
+    finally:
+        _progress['running'] = False
+        _empty_lock.release()
+
+def is_trash_empty():
+    return not os.path.isdir(TRASH_DIR) or not os.listdir(TRASH_DIR)
+
+def empty_trash_in_background():
+    """Start empty_trash on a daemon thread if there is anything to delete"""
+    if is_trash_empty():
+        return None
+    thread = threading.Thread(target=empty_trash, name="empty-trash", daemon=True)
+    thread.start()
+    return thread
+
+def trash_progress():
+    """Snapshot of the current (or last) trash deletion"""
+    return dict(_progress)
@@ -1,8 +1,9 @@
 import os
-import requests
+import http_client
 import shutil
 import zipfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from config import (
     INSTALL_DIR,
     GITHUB_RELEASES_URL,
@@ -11,8 +12,13 @@ from config import (
     LOL_VERSION_FILE,
     DOWNLOAD_DIR,
     LOL_VERSION_URL,
+    DOWNLOAD_CHUNK_SIZE,
 )
 from logger import setup_logger
+from instrumentation import span
+from http_cache import get_json
+from repo_sync import sync_repo
+from trash import reset_dir, empty_trash_in_background
 
 logger = setup_logger(__name__)
 
@@ -25,20 +31,39 @@ def get_installed_version():
         return None
 
 
-def get_latest_manager_version():
+def get_current_lol_version():
+    """LoL version the local data was last synced to, without any network access"""
+    try:
+        with open(LOL_VERSION_FILE, 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def get_latest_release():
+    """Get the latest manager release payload from GitHub (cached)"""
+    try:
+        with span("update_check.release"):
+            return get_json(GITHUB_RELEASES_URL)
+    except Exception as e:
+        logger.error(f"Manager release fetch failed: {e}")
+        return None
+
+def get_latest_manager_version(release_data=None):
     """Get latest manager version from GitHub"""
     try:
-        response = requests.get(GITHUB_RELEASES_URL, timeout=10)
-        response.raise_for_status()
-        return response.json().get("tag_name", "").replace("-prerelease", "")
+        release_data = release_data or get_latest_release()
+        if not release_data:
+            return None
+        return release_data.get("tag_name", "").replace("-prerelease", "")
     except Exception as e:
         logger.error(f"Manager version check failed: {e}")
         return None
 
 def get_latest_lol_version():
-    """Fetch latest League of Legends version from Riot API"""
+    """Fetch latest League of Legends version from Riot API (cached)"""
     try:
-        versions = requests.get(LOL_VERSION_URL, timeout=5).json()
+        with span("update_check.lol_version"):
+            versions = get_json(LOL_VERSION_URL)
         return versions[0] if versions else None
     except Exception as e:
         logger.error(f"LoL version fetch failed: {e}")
@@ -48,10 +73,10 @@ def download_asset(asset_url, temp_dir):
     """Download update asset"""
     temp_file = os.path.join(temp_dir, os.path.basename(asset_url))
     try:
-        with requests.get(asset_url, stream=True, timeout=30) as response:
+        with http_client.get(asset_url, stream=True) as response:
             response.raise_for_status()
             with open(temp_file, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     f.write(chunk)
         return temp_file
     except Exception as e:
@@ -86,19 +111,27 @@ def check_and_update():
     """
     Check for manager updates and LoL version changes.
     - Updates the manager if a new release exists.
-    - Resets skins if LoL version has changed.
+    - Syncs installed skins with the latest repository if LoL version has changed,
+      falling back to a full reset when there is nothing to diff against.
+      A sync that fails is retried on the next start instead.
     Returns:
-        dict: { 'manager_updated': bool, 'lol_version_changed': bool }
+        dict: { 'manager_updated': bool, 'lol_version_changed': bool,
+                'skins_synced': sync summary or None, 'sync_failed': bool }
     """
-    results = {'manager_updated': False, 'lol_version_changed': False}
+    results = {'manager_updated': False, 'lol_version_changed': False, 'skins_synced': None, 'sync_failed': False}
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        release_future = pool.submit(get_latest_release)
+        lol_future = pool.submit(get_latest_lol_version)
+        release_data = release_future.result()
+        latest_lol = lol_future.result()
 
     current_mgr = get_installed_version()
-    latest_mgr = get_latest_manager_version()
+    latest_mgr = get_latest_manager_version(release_data)
 
     if latest_mgr and current_mgr != latest_mgr:
         logger.info(f"Manager update: {current_mgr} -> {latest_mgr}")
         try:
-            release_data = requests.get(GITHUB_RELEASES_URL, timeout=10).json()
             asset_url = next(
                 (a["browser_download_url"] for a in release_data.get("assets", [])
                 if a["name"].endswith(".zip")),
@@ -111,27 +144,31 @@ def check_and_update():
                         logger.info("Manager updated successfully")
                         results['manager_updated'] = True
             else:
-                assets = release_data.json().get("assets", [])
+                assets = release_data.get("assets", [])
                 logger.warning(f"No .zip asset found in latest release ({latest_mgr}). "
                 f"Available assets: {[a['name'] for a in assets]}")
         except Exception as e:
             logger.error(f"Manager update process failed: {e}")
 
-    current_lol = None
-    if os.path.exists(LOL_VERSION_FILE):
-        with open(LOL_VERSION_FILE, 'r') as f:
-            current_lol = f.read().strip()
+    current_lol = get_current_lol_version()
 
-    latest_lol = get_latest_lol_version()
     if latest_lol and current_lol != latest_lol:
         logger.info(f"LoL version changed: {current_lol} -> {latest_lol}")
-        print(f"New LoL version detected: {latest_lol}. Resetting skins...")
+        print(f"New LoL version detected: {latest_lol}. Updating skins...")
 
-        shutil.rmtree(DOWNLOAD_DIR, ignore_errors=True)
-        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-        installed_dir = os.path.join(INSTALL_DIR, "installed")
-        shutil.rmtree(installed_dir, ignore_errors=True)
-        os.makedirs(installed_dir, exist_ok=True)
+        try:
+            results['skins_synced'] = sync_repo()
+        except Exception as e:
+            # Installed skins are kept and the version is not recorded, so the next start retries
+            logger.error(f"Skin sync failed: {e}")
+            results['sync_failed'] = True
+            return results
+
+        if results['skins_synced'] is None:
+            print("Resetting skins...")
+            reset_dir(DOWNLOAD_DIR)
+            reset_dir(os.path.join(INSTALL_DIR, "installed"))
+            empty_trash_in_background()
 
         with open(LOL_VERSION_FILE, 'w') as f:
             f.write(latest_lol)
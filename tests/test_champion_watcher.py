@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+os.environ.setdefault("LSM_PROJECT_ROOT", tempfile.mkdtemp(prefix="lsm-test-"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import champion_watcher
+
+def _counts(**values):
+    counts = {'installed': 0, 'skipped': 0, 'repaired': 0, 'registered': 0, 'failed': 0}
+    counts.update(values)
+    return counts
+
+class StageChampionTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(champion_watcher, "find_champion", return_value=None),
+            mock.patch.object(champion_watcher, "champion_source", return_value=("Aatrox", "Aatrox.zip")),
+            mock.patch.object(champion_watcher, "apply_on_demand"),
+            mock.patch.object(champion_watcher, "load_enabled_mods", return_value=[]),
+            mock.patch.object(champion_watcher, "load_installed_manifest", return_value={}),
+            mock.patch.object(champion_watcher, "save_enabled_mods"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_failed_install_raises(self):
+        with mock.patch.object(champion_watcher, "install_skins", return_value=_counts(installed=1, failed=2)):
+            with self.assertRaises(RuntimeError):
+                champion_watcher.stage_champion("Aatrox")
+
+    def test_failed_install_is_retried_with_backoff(self):
+        results = [_counts(failed=3), _counts(failed=3), _counts(installed=3)]
+        install = mock.Mock(side_effect=lambda *args, **kwargs: results.pop(0) if results else _counts(skipped=3))
+        ready = []
+        stop = threading.Event()
+
+        def on_ready(champion, folder, latency):
+            ready.append(folder)
+            stop.set()
+
+        with mock.patch.object(champion_watcher, "install_skins", install):
+            champion_watcher.watch_champion_select(
+                [lambda: "Aatrox"], stop_event=stop, min_interval=0.01, max_interval=0.01, on_ready=on_ready
+            )
+
+        self.assertEqual(install.call_count, 3)
+        self.assertEqual(ready, ["Aatrox"])
+
+    def test_overlay_is_built_before_ready(self):
+        events = []
+        stop = threading.Event()
+
+        def on_ready(champion, folder, latency):
+            events.append("ready")
+            stop.set()
+
+        with mock.patch.object(champion_watcher, "install_skins", return_value=_counts(installed=3)), \
+                mock.patch.object(champion_watcher, "build_overlay", side_effect=lambda *a, **k: events.append("build") or True), \
+                mock.patch.object(champion_watcher, "run_overlay", side_effect=lambda *a, **k: events.append("run")):
+            champion_watcher.watch_champion_select(
+                [lambda: "Aatrox"], stop_event=stop, min_interval=0.01, on_ready=on_ready, game_path="game"
+            )
+
+        self.assertEqual(events[0], "build")
+        self.assertIn("ready", events)
+
+class EnableChampionModsTest(unittest.TestCase):
+    def setUp(self):
+        manifest = {
+            f"{champion} {skin}": {'member': f"lol-skins-main/skins/{champion}/{champion} {skin}.zip"}
+            for champion in ("Aatrox", "Ahri") for skin in ("A", "B")
+        }
+        self.profile = ["Other mod"]
+        patches = [
+            mock.patch.object(champion_watcher, "load_installed_manifest", return_value=manifest),
+            mock.patch.object(champion_watcher, "load_enabled_mods", side_effect=lambda: list(self.profile)),
+            mock.patch.object(champion_watcher, "save_enabled_mods", side_effect=self._save),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        champion_watcher._save_auto_enabled([])
+
+    def _save(self, mods):
+        self.profile = list(mods)
+
+    def test_one_skin_replaces_previous_champion(self):
+        self.assertEqual(champion_watcher.enable_champion_mods("Aatrox"), "Aatrox A")
+        self.assertEqual(self.profile, ["Other mod", "Aatrox A"])
+        self.assertEqual(champion_watcher.enable_champion_mods("Ahri"), "Ahri A")
+        self.assertEqual(self.profile, ["Other mod", "Ahri A"])
+
+    def test_skin_picked_in_profile_is_kept(self):
+        self.profile = ["Ahri B"]
+        self.assertEqual(champion_watcher.enable_champion_mods("Ahri"), "Ahri B")
+        self.assertEqual(self.profile, ["Ahri B"])
+        champion_watcher.enable_champion_mods("Aatrox")
+        self.assertEqual(self.profile, ["Ahri B", "Aatrox A"])
+
+if __name__ == "__main__":
+    unittest.main()